@@ -0,0 +1,76 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Renders a dashboard of 12 widgets that each wait on their data (20 to 130 ms),
+fetching the data one widget after the other before building the page, and with
+async render methods awaited at once by __async_render__.
+
+    python benchmarks/async_render.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import Component, div, h2, li, ul
+
+LATENCIES = [0.02 + 0.01 * i for i in range(12)]
+
+
+async def fetch(n):
+    await asyncio.sleep(LATENCIES[n])
+    return [f"row {i} of widget {n}" for i in range(20)]
+
+
+class Widget(Component):
+    def render(self, n, rows):
+        return div(h2(f"widget {n}"), ul(*[li(row) for row in rows]), cls="widget")
+
+
+class AsyncWidget(Component):
+    async def render(self, n):
+        return div(
+            h2(f"widget {n}"), ul(*[li(row) for row in await fetch(n)]), cls="widget"
+        )
+
+
+async def serial():
+    rows = [await fetch(n) for n in range(len(LATENCIES))]
+    with div(cls="dashboard") as page:
+        for n in range(len(LATENCIES)):
+            Widget(n, rows[n])
+    return "".join([chunk async for chunk in page.__async_render__()])
+
+
+async def concurrent():
+    with div(cls="dashboard") as page:
+        for n in range(len(LATENCIES)):
+            AsyncWidget(n)
+    return "".join([chunk async for chunk in page.__async_render__()])
+
+
+async def bench(function):
+    start = time.perf_counter()
+    html = await function()
+    return time.perf_counter() - start, html
+
+
+async def main():
+    serial_time, serial_html = await bench(serial)
+    concurrent_time, concurrent_html = await bench(concurrent)
+    assert serial_html == concurrent_html
+    print(f"sum of latencies : {sum(LATENCIES) * 1000:8.1f} ms")
+    print(f"max of latencies : {max(LATENCIES) * 1000:8.1f} ms")
+    print(f"serial           : {serial_time * 1000:8.1f} ms")
+    print(f"concurrent       : {concurrent_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
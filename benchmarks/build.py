@@ -0,0 +1,61 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Builds a deep tree of components that belongs to a document, once bottom-up and
+once by wrapping the tree in a new component on every level while it is attached.
+
+    python benchmarks/build.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import Component, div, li, span, ul
+
+
+class Card(Component):
+    # every card is 10 nodes (tags and text) besides its children
+    def render(self, *children):
+        return div(
+            span("title", cls="title"),
+            ul(li("one"), li("two"), li("three")),
+            *children,
+            cls="card",
+        )
+
+
+def build_bottom_up(depth=300):
+    node = Card()
+    for _ in range(depth):
+        node = Card(node)
+    root = div()
+    root.setdocument(root)
+    root.add(node)
+    return root
+
+
+def build_wrapped(depth=300):
+    # a layout wrapping content that already is in the document
+    root = div()
+    root.setdocument(root)
+    node = root.add(Card())
+    for _ in range(depth):
+        root.remove(node)
+        node = root.add(Card(node))
+    return root
+
+
+def bench(build, number=3):
+    return min(timeit.repeat(build, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    print(f"bottom-up : {bench(build_bottom_up) * 1000:8.2f} ms")
+    print(f"wrapped   : {bench(build_wrapped) * 1000:8.2f} ms")
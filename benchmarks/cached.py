@@ -0,0 +1,50 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Renders a page with a sidebar of 300 links, building the sidebar on every render
+and keeping it in a Cached fragment.
+
+    python benchmarks/cached.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import Cached, a, aside, div, h1, li, main, p, ul
+
+
+def sidebar(links=300):
+    with aside(cls="sidebar") as root:
+        with ul():
+            for i in range(links):
+                li(a(f"page {i}", href=f"/pages/{i}", cls="link"))
+    return root
+
+
+def page(cached):
+    with div(cls="layout") as root:
+        if cached:
+            Cached("sidebar", sidebar, ttl=60)
+        else:
+            sidebar()
+        with main():
+            h1("title")
+            p("content")
+    return root.__render__(pretty=False)
+
+
+def bench(function, number=10):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    assert page(cached=False) == page(cached=True)
+    print(f"built  : {bench(lambda: page(cached=False)) * 1000:8.3f} ms")
+    print(f"cached : {bench(lambda: page(cached=True)) * 1000:8.3f} ms")
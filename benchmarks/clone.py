@@ -0,0 +1,52 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Copies a template of tags with clone and with copy.deepcopy, once for a small
+tag used as a decorator and once for a 200 row table, and renders the copies.
+
+    python benchmarks/clone.py
+"""
+
+import copy
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import a, div, li, span, table, tbody, td, tr, ul
+
+
+def small():
+    return div(span("title", cls="title"), a("more", href="#"), cls="card")
+
+
+def large(rows=200):
+    body = tbody()
+    for i in range(rows):
+        body.add(tr(td(i), td(f"row {i}", cls="name"), td(ul(li("x"), li("y")))))
+    return div(table(body), id="app", data={"rows": rows})
+
+
+def bench(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    for name, template in (("small", small()), ("table", large())):
+        template.__render__(pretty=False)
+        copiers = (
+            ("clone", lambda: template.clone()),
+            ("deepcopy", lambda: copy.deepcopy(template)),
+        )
+        for label, copier in copiers:
+            copied = bench(copier)
+            rendered = bench(lambda: copier().__render__(pretty=False))
+            print(
+                f"{name:6s} {label:9s}: copy {copied * 1000:8.3f} ms, "
+                f"copy + render {rendered * 1000:8.3f} ms"
+            )
@@ -0,0 +1,57 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Renders a grid of 1,000 cards by building the component of every card and with
+the compiled render of the component.
+
+    python benchmarks/compiled.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import Component, a, div, h2, li, p, span, ul
+
+
+class Card(Component):
+    def render(self, title, body, href="#"):
+        return div(
+            div(h2(title, cls="card-title"), span("new", cls="badge"), cls="head"),
+            p(body, cls="card-body"),
+            ul(li("one"), li("two"), li("three"), cls="tags"),
+            a("read more", href=href, cls="link"),
+            cls="card",
+        )
+
+
+def grid(cards=1000):
+    return [(f"card {i}", f"body of card {i}", f"/cards/{i}") for i in range(cards)]
+
+
+def render_components(items):
+    return "".join(Card(*item).__render__(pretty=False) for item in items)
+
+
+def render_compiled(items):
+    render = Card.compile().render
+    return "".join(render(*item) for item in items)
+
+
+def bench(function, number=3):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    items = grid()
+    assert render_components(items) == render_compiled(items)
+    normal = bench(lambda: render_components(items))
+    compiled = bench(lambda: render_compiled(items))
+    print(f"components: {normal * 1000:8.2f} ms")
+    print(f"compiled  : {compiled * 1000:8.2f} ms  ({normal / compiled:.0f}x)")
@@ -0,0 +1,76 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Streams a page with a header, 3 slow widgets (100, 200 and 300 ms) and 200 rows
+of content, once with the widgets in place (Await, the page is sent up to the
+first one still pending) and once with Deferred boundaries, and reports when the
+first chunk and the last chunk are sent.
+
+    python benchmarks/deferred.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import anyio
+
+from uidom.dom import Await, Deferred, body, div, h1, h2, head, html, li, p, title, ul
+
+LATENCIES = [0.1, 0.2, 0.3]
+
+
+async def widget(n):
+    await asyncio.sleep(LATENCIES[n])
+    return div(h2(f"widget {n}"), ul(*[li(f"item {i}") for i in range(20)]))
+
+
+def page(boundary):
+    with html() as document:
+        with head():
+            title("dashboard")
+        with body():
+            h1("dashboard")
+            for n in range(len(LATENCIES)):
+                boundary(n)
+            with ul(cls="content"):
+                for i in range(200):
+                    li(f"row {i}")
+    return document
+
+
+async def bench(boundary):
+    document = page(boundary)
+    start = time.perf_counter()
+    first = None
+    size = 0
+    # the awaitables run in a task group of the response, as in StreamingResponse
+    async with anyio.create_task_group() as tasks:
+        async for chunk in document.__async_render__(pretty=False, task_group=tasks):
+            if first is None:
+                first = time.perf_counter() - start
+            size += len(chunk)
+    return first, time.perf_counter() - start, size
+
+
+async def main():
+    # the first stream pays for the imports and the setup of the event loop
+    await bench(lambda n: Await(widget(n)))
+    awaited = await bench(lambda n: Await(widget(n)))
+    deferred = await bench(lambda n: Deferred(widget(n), p("loading")))
+    for name, (first, last, size) in (("await", awaited), ("deferred", deferred)):
+        print(
+            f"{name:9}: first chunk {first * 1000:7.1f} ms,"
+            f" last chunk {last * 1000:7.1f} ms, {size} characters"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Diffs two renders of a 1,000 row table where one row changed, against sending
+the whole table again.
+
+    python benchmarks/diff.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import div, table, tbody, td, tr
+from uidom.dom.src.diff import diff, patches_to_htmx, patches_to_json, snapshot
+
+
+def build(rows=1000, changed=None):
+    body = tbody(id="rows")
+    for i in range(rows):
+        name = "changed" if i == changed else f"row {i}"
+        body.add(tr(td(i), td(name), td(f"{i * 3} items"), id=f"row-{i}"))
+    return div(table(body), id="app")
+
+
+def bench(function, number=5):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    old, new = build(), build(changed=500)
+    old_snapshot = snapshot(old)
+    patches = diff(old_snapshot, new)
+
+    new.__render__(pretty=False)
+    render = bench(lambda: new.__render__(pretty=False))
+    snap = bench(lambda: snapshot(new))
+    compare = bench(lambda: diff(old_snapshot, new))
+    html = new.__render__(pretty=False)
+    print(f"render (cached): {render * 1000:8.2f} ms  {len(html):8d} bytes")
+    print(f"snapshot      : {snap * 1000:8.2f} ms")
+    print(
+        f"diff          : {compare * 1000:8.2f} ms  {len(patches_to_json(patches)):8d} "
+        f"bytes json, {len(patches)} patches"
+    )
+    print(f"htmx oob      : {len(patches_to_htmx(patches, new)):8d} bytes")
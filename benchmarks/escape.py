@@ -0,0 +1,50 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Compares escape() and escape_attribute() with the plain four replace passes.
+
+    python benchmarks/escape.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom.src.utils.dom_util import escape, escape_attribute
+
+SAMPLES = {
+    "text": "description of item 12",
+    "tailwind": "px-4 py-2 bg-rose-500 text-white hover:bg-rose-600 rounded-lg",
+    "hx-get": "/items/12?page=3&sort=name",
+    "paragraph": "lorem ipsum dolor sit amet " * 40,
+    "escaped": "a < b & b > c " * 40,
+}
+
+
+def escape_replace(data, quote=True):
+    data = data.replace("&", "&amp;")
+    data = data.replace("<", "&lt;")
+    data = data.replace(">", "&gt;")
+    if quote:
+        data = data.replace('"', "&quot;")
+    return data
+
+
+def bench(func, data, number=100000):
+    return min(timeit.repeat(lambda: func(data), number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'':10} {'replace':>10} {'escape':>10} {'attribute':>10}")
+    for name, data in SAMPLES.items():
+        timings = [
+            bench(func, data) * 1e9
+            for func in (escape_replace, escape, escape_attribute)
+        ]
+        print(f"{name:10}", *(f"{timing:8.0f}ns" for timing in timings))
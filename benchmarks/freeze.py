@@ -0,0 +1,54 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Renders pages with a navbar and a footer of 2,000 links, built for every page,
+built once at import as tags and frozen once at import. Every page is a new
+tree, as on every request.
+
+    python benchmarks/freeze.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import a, body, div, footer, li, main, nav, p, ul
+
+
+def chrome(links=1000):
+    navbar = nav(ul(*[li(a(f"page {i}", href=f"/{i}")) for i in range(links)]))
+    bottom = footer(ul(*[li(a(f"link {i}", href=f"/l/{i}")) for i in range(links)]))
+    return navbar, bottom
+
+
+NAVBAR, FOOTER = chrome()
+FROZEN_NAVBAR, FROZEN_FOOTER = NAVBAR.freeze(), FOOTER.freeze()
+
+
+def page(navbar, bottom, pretty):
+    root = body(div(navbar, main(p("content")), bottom, cls="layout"))
+    return root.__render__(pretty=pretty)
+
+
+def bench(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    for pretty in (False, True):
+        mode = "pretty" if pretty else "minified"
+        # the shared tags are moved into every new page and keep their
+        # rendered fragments, rebuilt ones are rendered from scratch
+        rebuilt = bench(lambda: page(*chrome(), pretty))
+        tags = bench(lambda: page(NAVBAR, FOOTER, pretty))
+        frozen = bench(lambda: page(FROZEN_NAVBAR, FROZEN_FOOTER, pretty))
+        assert page(*chrome(), pretty) == page(FROZEN_NAVBAR, FROZEN_FOOTER, pretty)
+        print(f"{mode:8s} built : {rebuilt * 1000:8.3f} ms")
+        print(f"{mode:8s} tags  : {tags * 1000:8.3f} ms")
+        print(f"{mode:8s} frozen: {frozen * 1000:8.3f} ms")
@@ -0,0 +1,51 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Builds and renders a page of 500 cards called with 20 different arguments, with
+and without a memo on the card component.
+
+    python benchmarks/memo.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import Component, RenderMemo, a, div, h2, li, p, span, ul
+
+
+class Card(Component):
+    def render(self, title, body, href="#"):
+        return div(
+            div(h2(title, cls="card-title"), span("new", cls="badge"), cls="head"),
+            p(body, cls="card-body"),
+            ul(li("one"), li("two"), li("three"), cls="tags"),
+            a("read more", href=href, cls="link"),
+            cls="card",
+        )
+
+
+def page(cards=500, distinct=20):
+    with div(cls="grid") as root:
+        for i in range(cards):
+            n = i % distinct
+            Card(f"card {n}", f"body of card {n}", href=f"/cards/{n}")
+    return root.__render__(pretty=False)
+
+
+def bench(function, number=3):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    plain = bench(page)
+    Card.memo = RenderMemo(maxsize=64)
+    memoized = bench(page)
+    print(f"render     : {plain * 1000:8.2f} ms")
+    print(f"memoized   : {memoized * 1000:8.2f} ms  {Card.memo.info()}")
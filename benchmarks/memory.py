@@ -0,0 +1,132 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Measures the memory of a ~100k node admin table and of a text heavy article
+with tracemalloc, next to the same pages built in the same run by the package
+of a git revision (HEAD unless one is given, ex. the commit before tags were
+slotted and text children were kept as plain strings).
+
+    python benchmarks/memory.py [revision]
+"""
+
+import gc
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def build_table(rows=10000):
+    # imported here, the package measured is the one put on the path first
+    from uidom.dom import a, table, tbody, td, th, thead, tr
+
+    # every row is 10 tags and text nodes
+    with table(cls="admin") as page:
+        with thead():
+            with tr():
+                for name in ("id", "name", "email", "edit"):
+                    th(name)
+        with tbody():
+            for i in range(rows):
+                with tr(cls="row"):
+                    td(i)
+                    td(f"user {i}")
+                    td(f"user{i}@example.com")
+                    with td():
+                        a("edit", href=f"/users/{i}")
+    return page
+
+
+def build_article(sections=2000):
+    from uidom.dom import a, article, code, em, h2, p
+
+    # the shape of a rendered markdown document, mostly text runs
+    with article(cls="prose") as page:
+        for i in range(sections):
+            h2(f"Section {i}")
+            p(
+                em("Lorem ipsum"),
+                " dolor sit amet, consectetur adipiscing elit, see ",
+                code(f"section_{i}()"),
+                " and ",
+                a("the reference", href=f"#ref-{i}"),
+                ".",
+            )
+            p("Sed do eiusmod tempor incididunt ut labore et dolore magna.")
+            p(f"Paragraph {i} ends here.")
+    return page
+
+
+def count_nodes(page):
+    return 1 + sum(len(tag.children) for tag in [page, *page.get()])
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    page = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"nodes": count_nodes(page), "size": size, "build": elapsed}
+
+
+def measure_pages():
+    return {"table": measure(build_table), "article": measure(build_article)}
+
+
+def measure_revision(revision):
+    # the package of the revision is extracted aside and measured by this script
+    # in a process of its own
+    archive = subprocess.run(
+        ["git", "archive", revision, "uidom"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as source:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(source)
+        output = subprocess.run(
+            [sys.executable, __file__, "--source", source],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output)
+
+
+def report(name, result, before, revision):
+    nodes, size = result["nodes"], result["size"]
+    before_per_node = before["size"] / before["nodes"]
+    print(name)
+    print(f"  nodes    : {nodes}")
+    print(f"  memory   : {size / 1024 / 1024:8.2f} MiB")
+    print(f"  per node : {size / nodes:8.0f} bytes ({revision}: {before_per_node:.0f})")
+    print(f"  build    : {result['build'] * 1000:8.0f} ms ", end="")
+    print(f"({revision}: {before['build'] * 1000:.0f})")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--source"]:
+        # measuring the package of a revision for the run below
+        sys.path.insert(0, sys.argv[2])
+        print(json.dumps(measure_pages()))
+    else:
+        revision = sys.argv[1] if len(sys.argv) > 1 else "HEAD"
+        before = measure_revision(revision)
+        # run from a checkout without installing the package
+        sys.path.insert(0, str(ROOT))
+        for name, result in measure_pages().items():
+            report(name, result, before[name], revision)
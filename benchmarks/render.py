@@ -0,0 +1,54 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Renders a page of ~10k nodes, pretty and minified.
+
+    python benchmarks/render.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# run from a checkout without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from uidom.dom import a, div, li, p, span, ul
+
+
+def build_page(rows=1500):
+    # every row is 7 nodes (tags and text)
+    with div(id="page", cls="container mx-auto") as page:
+        with ul(cls="list"):
+            for i in range(rows):
+                with li(cls="item", data_index=i):
+                    span(f"item {i}", cls="title")
+                    p(f"description of item {i}")
+                    a("open", href=f"/items/{i}")
+    return page
+
+
+def drop_render_cache(page):
+    # benchmark the render itself, not the cached fragments
+    page._render_cache = None
+    for tag in page.get():
+        tag._render_cache = None
+
+
+def bench(page, number=10, **options):
+    def render():
+        drop_render_cache(page)
+        page.__render__(**options)
+
+    return min(timeit.repeat(render, number=number, repeat=3)) / number
+
+
+if __name__ == "__main__":
+    page = build_page()
+    pretty = bench(page, pretty=True)
+    minified = bench(page, pretty=False)
+    print(f"pretty   : {pretty * 1000:8.2f} ms")
+    print(f"minified : {minified * 1000:8.2f} ms ({pretty / minified:.1f}x)")
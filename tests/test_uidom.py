@@ -1,14 +1,20 @@
 import asyncio
 import typing as t
 import unittest
+from contextlib import ExitStack
 from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from textwrap import dedent
 
+import anyio
 import toml
 
 from uidom import Document, __version__
 from uidom.alpinejs import DataSet
 from uidom.dom import *
+from uidom.dom.src.diff import diff, patches_to_htmx, patches_to_json, snapshot
 from uidom.dom.src.dom_tag import attr
 from uidom.web_io._events import BaseEventManager
 
@@ -393,6 +399,33 @@ class TestStates(unittest.TestCase):
         state_elem.a += 1
         self.assertEqual(state_elem.to_dict(), {"a": 3})
 
+    def test_to_dict_converts_like_asdict(self):
+        @dataclass
+        class Point:
+            x: int
+            y: int
+
+        @dataclass(eq=False)
+        class Shape(Component):
+            points: list
+            labels: dict
+
+            def __post_init__(self):
+                super(Shape, self).__init__()
+
+            def render(self):
+                return div()
+
+        shape = Shape([Point(1, 2)], {"origin": (Point(0, 0),)})
+        self.assertEqual(
+            shape.to_dict(),
+            {
+                "points": [{"x": 1, "y": 2}],
+                "labels": {"origin": ({"x": 0, "y": 0},)},
+            },
+        )
+        self.assertIsNot(shape.to_dict()["points"], shape.points)
+
     def test_states_mutation_rerenders_element(self):
         state_elem = self.StateElement(a=2)
         self.assertEqual(str(state_elem), """<p a="2">\n</p>""")
@@ -813,6 +846,1368 @@ class TestFragments(unittest.TestCase):
         )
 
 
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        with div() as page:
+            with ul() as nav:
+                li("home")
+                li("about")
+            counter = span("1")
+        self.page = page
+        self.nav = nav
+        self.counter = counter
+
+    def test_unchanged_subtree_is_reused(self):
+        first = self.page.__render__()
+        self.assertIsNotNone(self.nav._render_cache)
+
+        self.counter.clear()
+        self.counter.add("2")
+        # only the path from the changed tag to the root is dropped
+        self.assertIsNone(self.counter._render_cache)
+        self.assertIsNone(self.page._render_cache)
+        self.assertIsNotNone(self.nav._render_cache)
+        self.assertEqual(self.page.__render__(), first.replace("1", "2"))
+
+    def test_attribute_change_invalidates(self):
+        self.page.__render__(pretty=False)
+        self.nav["class"] = "menu"
+        self.assertEqual(
+            self.page.__render__(pretty=False),
+            '<div><ul class="menu"><li>home</li><li>about</li></ul><span>1</span></div>',
+        )
+
+    def test_direct_mutation_invalidates(self):
+        self.page.__render__(pretty=False)
+        self.nav.attributes["class"] = "menu"
+        self.counter.children.append("2")
+        self.assertEqual(
+            self.page.__render__(pretty=False),
+            '<div><ul class="menu"><li>home</li><li>about</li></ul>'
+            "<span>12</span></div>",
+        )
+
+    def test_values_changed_in_place(self):
+        with div() as page:
+            tag = span(data={"x": [1]})
+        page.__render__(pretty=False)
+        # a value that can change in place keeps the path to the root uncached
+        self.assertIsNone(tag._render_cache)
+        self.assertIsNone(page._render_cache)
+        tag["data"]["x"].append(2)
+        self.assertIn("[1, 2]", page.__render__(pretty=False))
+
+    def test_safe_attributes_changed(self):
+        class Quoted(span):
+            tagname = "span"
+            safe_attributes = {}
+
+        with div() as page:
+            Quoted(title="<b>")
+        self.assertEqual(
+            page.__render__(pretty=False), '<div><span title="&lt;b&gt;"></span></div>'
+        )
+        Quoted.safe_attributes["title"] = False
+        self.assertEqual(
+            page.__render__(pretty=False), '<div><span title="<b>"></span></div>'
+        )
+
+    def test_fragment_too_long_drops_the_others(self):
+        class Limited(ul):
+            tagname = "ul"
+            render_cache_limit = 60
+
+        with div() as page:
+            with Limited() as items:
+                for i in range(3):
+                    li(f"item {i}")
+        page.__render__(pretty=False)
+        self.assertIsNotNone(items._render_cache)
+        # the pretty fragment is too long, the minified one isn't kept either
+        page.__render__()
+        self.assertIsNone(items._render_cache)
+        self.assertIsNone(page._render_cache)
+
+    def test_dropped_fragment_drops_the_ancestors(self):
+        items = ul(*[li(str(i)) for i in range(3000)])
+        page = body(div(items))
+        page.__render__(pretty=False)
+        # the pretty fragment is too long, items keeps none
+        items.__render__()
+        items[0].set_attribute("class", "active")
+        self.assertIn('<li class="active">0</li>', page.__render__(pretty=False))
+
+    def test_children_set_by_index(self):
+        self.page.__render__(pretty=False)
+        new = li("new")
+        old = self.nav[0]
+        self.nav[0] = new
+        self.assertIs(new.parent, self.nav)
+        self.assertIsNone(old.parent)
+        self.page.__render__(pretty=False)
+        new["class"] = "active"
+        del self.nav[-1]
+        self.assertEqual(
+            self.page.__render__(pretty=False),
+            '<div><ul><li class="active">new</li></ul><span>1</span></div>',
+        )
+
+    def test_lazy_is_never_cached(self):
+        count = [0]
+
+        def counter():
+            count[0] += 1
+            return count[0]
+
+        with div() as page:
+            lazy(counter)
+        self.assertEqual(page.__render__(pretty=False), "<div>1</div>")
+        self.assertEqual(page.__render__(pretty=False), "<div>2</div>")
+        self.assertIsNone(page._render_cache)
+
+
+class TestRenderIsPure(unittest.TestCase):
+    def test_render_controls_are_not_attributes(self):
+        child = div(self_dedent=True)
+        parent = div(child, child_dedent=False)
+        self.assertEqual(child.attributes, {})
+        self.assertEqual(parent.attributes, {})
+        self.assertTrue(child.self_dedent)
+
+        first = parent.__render__()
+        # drop the cached fragments so that the tree is walked again
+        child._invalidate_render()
+        self.assertEqual(parent.__render__(), first)
+
+    def test_keyframes_render_keeps_attributes(self):
+        class slide(Keyframes):
+            pass
+
+        frames = slide(_from=dict(height="10px"), to=dict(height="20px"))
+        attributes = dict(frames.attributes)
+        frames.__render__()
+        self.assertEqual(frames.attributes, attributes)
+        with self.assertRaises(TypeError):
+            frames["to"] = "height: 20px"
+
+
+class TestMinifiedRender(unittest.TestCase):
+    def setUp(self) -> None:
+        from uidom.dom.src.jinjatags import Else, If
+        from uidom.dom.src.utils.dom_util import lazy
+
+        self.page = div(
+            comment("c"),
+            img(src="x"),
+            PlaceholderTag("a", span("b")),
+            raw("<b>r</b>"),
+            lazy(lambda: "lz"),
+            If("x", p("yes"), Else(p("no"))),
+            "text",
+            cls="c",
+        )
+
+    def test_minified(self):
+        self.assertEqual(
+            self.page.__render__(pretty=False),
+            '<div class="c"><!-- c --><img src="x">a<span>b</span><b>r</b>lz'
+            "{% if x %}<p>yes</p>{% else %}<p>no</p>{% endif %}text</div>",
+        )
+        self.assertIn(
+            '<img src="x"/>', self.page.__render__(pretty=False, xhtml=True)
+        )
+
+    def test_minified_style(self):
+        class rules(CSSClass):
+            pass
+
+        self.assertEqual(
+            style(rules(color="red", margin="0")).__render__(pretty=False),
+            "<style>.rules{color:red;margin:0;}</style>",
+        )
+
+
+class TestStreamingRender(unittest.TestCase):
+    def setUp(self) -> None:
+        self.page = html(
+            head(title("streaming"), link(href="site.css")),
+            body(*[div(p(f"row {i}"), cls="row") for i in range(2000)]),
+        )
+
+    def stream(self, **options):
+        async def main():
+            return [chunk async for chunk in self.page.__async_render__(**options)]
+
+        return asyncio.run(main())
+
+    def test_chunks(self):
+        chunks = self.stream(pretty=False, chunk_size=4096)
+        self.assertEqual("".join(chunks), self.page.__render__(pretty=False))
+        # the head is flushed on its own, the body is coalesced into chunks
+        self.assertTrue(chunks[0].endswith("</head>"))
+        self.assertTrue(all(len(chunk) >= 4096 for chunk in chunks[1:-1]))
+
+    def test_pretty_chunks(self):
+        chunks = self.stream()
+        self.assertEqual("".join(chunks), self.page.__render__())
+        self.assertTrue(chunks[0].endswith("</head>"))
+
+
+class TestRenderInto(unittest.TestCase):
+    def setUp(self) -> None:
+        self.page = div(p("naïve café"), span("€ 10"), cls="price")
+        self.html = self.page.__render__().encode("utf-8")
+
+    def test_bytearray(self):
+        buffer = self.page.render_into(bytearray())
+        self.assertEqual(bytes(buffer), self.html)
+
+    def test_writable(self):
+        buffer = self.page.render_into(BytesIO(), pretty=False)
+        self.assertEqual(
+            buffer.getvalue(), self.page.__render__(pretty=False).encode("utf-8")
+        )
+
+    def test_save(self):
+        with TemporaryDirectory() as folder:
+            file_path = Path(folder) / "page.html"
+            self.page.save(file_or_dir=file_path)
+            self.assertEqual(file_path.read_bytes(), self.html)
+            self.assertEqual(
+                [path.name for path in Path(folder).iterdir()], ["page.html"]
+            )
+
+    def test_html_response(self):
+        from uidom.response.starlette import HTMLResponse
+
+        self.assertEqual(
+            HTMLResponse(self.page).body,
+            self.page.__render__(pretty=False).encode("utf-8"),
+        )
+
+
+class TestEscape(unittest.TestCase):
+    def test_escape(self):
+        from uidom.dom.src.utils.dom_util import escape
+
+        text = "nothing to escape"
+        self.assertIs(escape(text), text)
+        self.assertEqual(escape('a < "b" & c'), "a &lt; &quot;b&quot; &amp; c")
+        self.assertEqual(escape('"b"', quote=False), '"b"')
+        self.assertEqual(escape('"b"'), "&quot;b&quot;")
+
+    def test_escape_attribute(self):
+        from uidom.dom.src.utils.dom_util import _attribute_cache, escape_attribute
+
+        url = "/items?page=1&sort=name"
+        self.assertEqual(escape_attribute(url), "/items?page=1&amp;sort=name")
+        self.assertIs(escape_attribute(url), escape_attribute(url))
+        # long values are escaped without being kept
+        style = "color: red; " * 100 + "&"
+        self.assertEqual(escape_attribute(style), style[:-1] + "&amp;")
+        self.assertNotIn(style, _attribute_cache)
+        self.assertEqual(
+            str(div(hx_get=url)), '<div hx-get="/items?page=1&amp;sort=name">\n</div>'
+        )
+
+
+class TestClassAttribute(unittest.TestCase):
+    def test_class_is_normalized_when_set(self):
+        classes = """
+            px-4 py-2
+            bg-rose-500   text-white
+        """
+        first, second = div(cls=classes), span()
+        second["class"] = classes
+        self.assertEqual(first.attributes["class"], "px-4 py-2 bg-rose-500 text-white")
+        # identical class strings share memory
+        self.assertIs(first.attributes["class"], second.attributes["class"])
+        self.assertEqual(
+            first.__render__(pretty=False),
+            '<div class="px-4 py-2 bg-rose-500 text-white"></div>',
+        )
+
+
+class TestAttributesString(unittest.TestCase):
+    def test_attributes_string_is_dropped_on_change(self):
+        tag = div(id="a", x_data={"open": False})
+        self.assertEqual(
+            tag.__render__(pretty=False),
+            """<div id="a" x-data='{"open": false}'></div>""",
+        )
+        # json values can change in place, their string isn't kept
+        self.assertIsNone(tag._attributes_string)
+        tag["id"] = "b"
+        self.assertIn('id="b"', tag.__render__(pretty=False))
+        del tag["x-data"]
+        self.assertEqual(tag.__render__(pretty=False), '<div id="b"></div>')
+        self.assertIsNotNone(tag._attributes_string)
+        tag["id"] = "c"
+        self.assertIsNone(tag._attributes_string)
+
+    def test_values_changed_in_place(self):
+        tag = div(data={"x": [1]})
+        self.assertEqual(self.attributes(tag), """ data='{"x": [1]}'""")
+        tag["data"]["x"].append(2)
+        self.assertEqual(self.attributes(tag), """ data='{"x": [1, 2]}'""")
+
+    def test_safe_attributes_changed(self):
+        from uidom.dom.src.ext import SafeAttributes
+
+        class Quoted(div):
+            safe_attributes = {}
+
+        self.assertIs(type(Quoted.safe_attributes), SafeAttributes)
+        tag = Quoted(title="<b>")
+        self.assertEqual(self.attributes(tag), ' title="&lt;b&gt;"')
+        Quoted.safe_attributes["title"] = False
+        self.assertEqual(self.attributes(tag), ' title="<b>"')
+        Quoted.safe_attributes.clear()
+        self.assertEqual(self.attributes(tag), ' title="&lt;b&gt;"')
+
+    def attributes(self, tag):
+        return "".join(tag._render_attribute([], 0, "", False))
+
+    def test_insertion_order(self):
+        self.assertEqual(
+            div(title="t", id="a").__render__(pretty=False),
+            '<div id="a" title="t"></div>',
+        )
+        tag = div(title="t", id="a", sort_attributes=False)
+        self.assertEqual(tag.__render__(pretty=False), '<div title="t" id="a"></div>')
+        self.assertNotIn("sort_attributes", tag.attributes)
+
+
+class TestCleanAttribute(unittest.TestCase):
+    def test_names_are_cleaned_once_per_class(self):
+        class card(div):
+            pass
+
+        tag = card(className="c", hx_get="/a", x_on_click="open = true")
+        self.assertEqual(list(tag.attributes), ["class", "hx-get", "@click"])
+        self.assertEqual(
+            card._clean_attribute_cache[1],
+            {"className": "class", "hx_get": "hx-get", "x_on_click": "@click"},
+        )
+
+    def test_prefix_map_change_drops_the_cache(self):
+        class card(div):
+            attribute_prefix_map = {}
+
+        self.assertIn("my_data", card(my_data=1).attributes)
+        card.attribute_prefix_map["my_"] = "my-"
+        self.assertIn("my-data", card(my_data=1).attributes)
+        card.attribute_prefix_map = {}
+        self.assertIn("my_data", card(my_data=1).attributes)
+
+    def test_cache_is_bounded(self):
+        class card(div):
+            attribute_name_cache_size = 8
+
+        for i in range(20):
+            card(**{f"data_{i}": i})
+        self.assertLessEqual(len(card._clean_attribute_cache[1]), 8)
+        self.assertIn("data-19", card(data_19=1).attributes)
+
+
+class TestNodeLayout(unittest.TestCase):
+    def test_leaf_tags_share_empty_containers(self):
+        first, second = br(), br()
+        self.assertIs(first._attributes, second._attributes)
+        self.assertIs(first._children, second._children)
+        with self.assertRaises(TypeError):
+            first._attributes["id"] = "a"
+
+        first["id"] = "a"
+        first.add("text")
+        self.assertEqual(first.attributes, {"id": "a"})
+        self.assertEqual(second.attributes, {})
+        self.assertEqual(len(first.children), 1)
+        self.assertEqual(len(second.children), 0)
+
+    def test_with_frames_are_released(self):
+        with div() as page:
+            child = span()
+        self.assertIsNone(child._ctx)
+        self.assertIs(child.parent, page)
+
+    def test_copy(self):
+        import copy
+
+        tag = div(br(), span("a", id="b"))
+        self.assertEqual(str(copy.deepcopy(tag)), str(tag))
+
+
+class TestTextNodes(unittest.TestCase):
+    def test_text_is_stored_as_str(self):
+        tag = p("hello ", em("world"), 1)
+        self.assertIs(type(tag.children[0]), str)
+        self.assertEqual(tag.get(str), ["hello ", "world", "1"])
+        self.assertEqual(
+            tag.__render__(pretty=False), "<p>hello <em>world</em>1</p>"
+        )
+
+    def test_parent_of(self):
+        inner = em("world")
+        page = div(p("hello ", inner), em("world"))
+        self.assertIs(page.parent_of(inner), inner.parent)
+        self.assertIsNone(page.parent_of(page))
+        # equal strings can be one object held by many tags
+        with self.assertRaises(TypeError):
+            page.parent_of("world")
+
+    def test_text_nodes(self):
+        first, second = p("hello ", em("world")), em("world")
+        page = div(first, second, "!")
+        nodes = list(page.text_nodes())
+        self.assertEqual([text for _, text in nodes], ["hello ", "world", "world", "!"])
+        for (parent, _), expected in zip(nodes, (first, first[1], second, page)):
+            self.assertIs(parent, expected)
+
+
+class TestWithContextTasks(unittest.TestCase):
+    def test_interleaved_tasks(self):
+        async def build_page(number):
+            with div(id=f"page-{number}") as page:
+                for row in range(3):
+                    with ul():
+                        # hand the loop over to the other tasks mid block
+                        await asyncio.sleep(0)
+                        li(f"{number}-{row}")
+            return page
+
+        async def build_pages():
+            return await asyncio.gather(*(build_page(i) for i in range(1000)))
+
+        pages = asyncio.run(build_pages())
+        for number, page in enumerate(pages):
+            self.assertEqual(
+                page.__render__(pretty=False),
+                f'<div id="page-{number}">'
+                + "".join(f"<ul><li>{number}-{row}</li></ul>" for row in range(3))
+                + "</div>",
+            )
+        self.assertIsNone(get_current(None))
+
+    def test_task_started_in_block(self):
+        async def child():
+            with span():
+                await asyncio.sleep(0)
+                b()
+
+        async def build():
+            with div() as page:
+                await asyncio.create_task(child())
+                p()
+            return page
+
+        page = asyncio.run(build())
+        self.assertEqual(
+            page.__render__(pretty=False), "<div><span><b></b></span><p></p></div>"
+        )
+
+
+class TestDocumentIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = div()
+        self.index = self.root.index_document()
+        with self.root:
+            with section() as self.section:
+                self.item = span(id="item", hidden=True)
+            p(id="other")
+
+    def test_lookups(self):
+        self.assertIs(self.root.getElementById("item"), self.item)
+        self.assertIs(self.section.getElementById("item"), self.item)
+        self.assertIsNone(self.section.getElementById("other"))
+        self.assertEqual(self.index.with_attribute("hidden"), [self.item])
+        self.assertIn(span, self.root)
+        self.assertIn("p", self.root)
+        self.assertNotIn(p, self.section)
+
+    def test_index_follows_changes(self):
+        self.item["id"] = "renamed"
+        self.assertIsNone(self.root.getElementById("item"))
+        self.assertIs(self.root.getElementById("renamed"), self.item)
+
+        self.section.remove(self.item)
+        self.assertIsNone(self.item.document)
+        self.assertIsNone(self.root.getElementById("renamed"))
+        self.assertNotIn(span, self.root)
+
+        self.section.add(self.item)
+        self.root.add(span(id="renamed"))
+        with self.assertRaises(ValueError):
+            self.root.getElementById("renamed")
+
+    def test_children_changed_by_index(self):
+        self.section[0] = b(id="bold")
+        self.assertIsNone(self.root.getElementById("item"))
+        self.assertIs(self.root.getElementById("bold"), self.section[0])
+        self.assertIsNone(self.item.document)
+
+        del self.root[-1]
+        self.assertIsNone(self.root.getElementById("other"))
+        self.assertNotIn(p, self.root)
+
+    def test_matches_get(self):
+        class Card(Component):
+            def render(self, *children):
+                return div(*children, id="card")
+
+        self.root.add(div(a(href="#"), b(), id="more"))
+        self.root.add(Card(i(id="inside")))
+        self.assertEqual(
+            sorted(map(id, self.index.of_type(dom_tag))),
+            sorted(map(id, self.root.get())),
+        )
+        # the same tags are found with and without the index
+        self.assertIsNone(self.root.getElementById("card"))
+        self.assertEqual(
+            self.root.getElementById("inside"), self.root.get(id="inside")[0]
+        )
+
+    def test_html_document(self):
+        with Document()(ensure_csrf_token=False) as doc:
+            button("go", id="go")
+        self.assertIs(doc.document, doc)
+        self.assertIs(doc.getElementById("go").parent.document, doc)
+        self.assertEqual(len(doc._document_index.with_id("go")), 1)
+
+
+class TestFind(unittest.TestCase):
+    def test_iter_find_is_lazy(self):
+        page = div(p("a", id="first"), p("b"), span(p("c")))
+        found = page.iter_find(p)
+        self.assertIs(next(found), page[0])
+        self.assertEqual(list(found), [page[1], page[2][0]])
+        self.assertEqual(list(page.iter_find(p)), page.get(p))
+
+    def test_find_first(self):
+        page = div(p(), p(id="x"), span(id="x"))
+        self.assertIs(page.find_first(id="x"), page[1])
+        self.assertIs(page.find_first("span"), page[2])
+        self.assertIsNone(page.find_first(a))
+
+
+class TestQuerySelector(unittest.TestCase):
+    def setUp(self):
+        class Menu(Component):
+            def render(self, *items):
+                return ul(*items, cls="menu")
+
+        with div(id="root") as self.root:
+            self.menu = Menu(
+                li(a("home", href="/"), cls="item"),
+                li(a("docs", href="/docs", data_x="1"), cls="item active"),
+            )
+            p(span("text"))
+
+    def test_selectors(self):
+        links = self.root.get(a)
+        self.assertEqual(self.root.querySelectorAll("a"), links)
+        self.assertEqual(self.root.querySelectorAll("ul.menu > li a"), links)
+        self.assertEqual(self.root.querySelectorAll("#root > ul > li > a"), links)
+        self.assertEqual(self.root.querySelectorAll("li.active [data-x]"), links[1:])
+        self.assertEqual(self.root.querySelectorAll("a[href='/docs']"), links[1:])
+        self.assertEqual(self.root.querySelectorAll("div > li"), [])
+        self.assertEqual(
+            self.root.querySelectorAll("p *, .menu"),
+            [self.menu._entry] + self.root.get(span),
+        )
+
+    def test_query_selector(self):
+        self.assertIs(self.root.querySelector(".item"), self.root.get(li)[0])
+        self.assertIsNone(self.root.querySelector("section"))
+        # ancestors above the tag the query starts from take part in the match
+        self.assertEqual(len(self.menu._entry.querySelectorAll("#root li")), 2)
+
+    def test_compiled_once(self):
+        from uidom.dom.src.selector import compile_selector
+
+        self.assertIs(compile_selector("ul > li"), compile_selector("ul > li"))
+        for selector in ("ul >", "li..item", "ul > > li", "a[href"):
+            with self.assertRaises(ValueError):
+                compile_selector(selector)
+
+
+class TestSiblings(unittest.TestCase):
+    def setUp(self):
+        self.items = [li(i) for i in range(5)]
+        self.list = ul(*self.items)
+
+    def test_walk(self):
+        node, seen = self.items[0], []
+        while node is not None:
+            seen.append(node)
+            node = node.nextSibling
+        self.assertEqual(seen, self.items)
+        self.assertIsNone(self.items[0].previousSibling)
+        self.assertIs(self.items[3].previousSibling, self.items[2])
+        self.assertIsNone(ul().previousSibling)
+
+    def test_mutations(self):
+        first, second, third = self.items[:3]
+        new = li("new")
+        self.list.insertBefore(new, second)
+        self.assertIs(first.nextSibling, new)
+        self.assertIs(second.previousSibling, new)
+
+        # moving a child keeps one copy of it
+        self.list.insertBefore(first, None)
+        self.assertIs(self.list.lastChild, first)
+        self.assertIs(self.list.firstChild, new)
+
+        self.list.replaceChild(li("other"), second)
+        self.assertIsNone(second.parent)
+        self.assertEqual(new.nextSibling.__render__(pretty=False), "<li>other</li>")
+        self.assertIs(new.nextSibling.nextSibling, third)
+
+        self.list.removeChild(third)
+        self.assertEqual(
+            self.list.__render__(pretty=False),
+            "<ul><li>new</li><li>other</li><li>3</li><li>4</li><li>0</li></ul>",
+        )
+        with self.assertRaises(ValueError):
+            self.list.removeChild(third)
+
+    def test_positions_follow_mutations(self):
+        self.list.insert(0, li("new"))
+        self.list.remove(self.items[2])
+        for position, node in enumerate(self.list.children):
+            self.assertEqual(node._position, position)
+
+    def test_component_mutations(self):
+        class Menu(Component):
+            def render(self, *items):
+                return ul(*items)
+
+        first, second = li("first"), li("second")
+        menu = Menu(first, second)
+        new = li("new")
+        menu.insertBefore(new, second)
+        self.assertIs(first.nextSibling, new)
+        menu.replaceChild(li("other"), first)
+        menu.removeChild(second)
+        self.assertEqual(
+            menu.__render__(pretty=False), "<ul><li>other</li><li>new</li></ul>"
+        )
+
+
+class TestDocumentOwner(unittest.TestCase):
+    def test_document_follows_parents(self):
+        first, second = div(), div()
+        first.setdocument(first)
+        second.setdocument(second)
+        leaf = span()
+        branch = section(div(p(leaf)))
+        self.assertIsNone(leaf.document)
+
+        first.add(branch)
+        self.assertIs(leaf.document, first)
+        self.assertIs(leaf.ownerDocument, first)
+
+        first.remove(branch)
+        self.assertIsNone(leaf.document)
+        self.assertIsNone(branch.document)
+
+        second.add(div(branch))
+        self.assertIs(leaf.document, second)
+        self.assertIs(first.document, first)
+
+    def test_document_set_below_the_root(self):
+        root, inner = div(), div()
+        root.setdocument(root)
+        root.add(section(inner))
+        leaf = inner.add(span())
+        inner.setdocument(inner)
+        self.assertIs(leaf.document, inner)
+        inner.setdocument(None)
+        self.assertIs(leaf.document, root)
+
+    def test_component_document(self):
+        class Card(Component):
+            def render(self, *children):
+                return div(*children, cls="card")
+
+        root = div()
+        root.setdocument(root)
+        leaf = span()
+        root.add(Card(Card(leaf)))
+        self.assertIs(leaf.document, root)
+
+    def test_moves_keep_other_trees(self):
+        first, second = div(), div()
+        first.setdocument(first)
+        second.setdocument(second)
+        leaf, other = span(), span()
+        first.add(section(div(leaf)))
+        second.add(section(other))
+        self.assertIs(leaf.document, first)
+        self.assertIs(other.document, second)
+        kept = leaf._document
+
+        # the kept documents of other subtrees are only dropped on a real change
+        second.add(p())
+        first.setdocument(first)
+        self.assertIs(leaf._document, kept)
+
+        moved = section(div(span()))
+        first.add(moved)
+        self.assertIs(moved.children[0].children[0].document, first)
+        second.add(moved)
+        self.assertIs(leaf._document, kept)
+        self.assertIs(moved.children[0].children[0].document, second)
+
+        branch = leaf.parent.parent
+        first.remove(branch)
+        self.assertIsNone(leaf.document)
+        div(branch)
+        second.add(branch.parent)
+        self.assertIs(leaf.document, second)
+        self.assertIs(other.document, second)
+
+
+class TestDiff(unittest.TestCase):
+    def rows(self, order, changed=None):
+        body = tbody(id="rows")
+        for i in order:
+            body.add(tr(td("changed" if i == changed else f"row {i}"), key=i))
+        return div(table(body), id="app")
+
+    def test_text_change(self):
+        patches = diff(self.rows(range(5)), self.rows(range(5), changed=3))
+        self.assertEqual(
+            patches_to_json(patches),
+            '[{"op": "text", "path": [0, 0, 3, 0, 0], "value": "changed"}]',
+        )
+        self.assertEqual(diff(self.rows(range(5)), self.rows(range(5))), [])
+
+    def test_keyed_children(self):
+        patches = diff(self.rows(range(4)), self.rows([3, 0, 2, 4]))
+        self.assertEqual(
+            [(patch.op, patch.index, patch.value) for patch in patches],
+            [
+                ("remove_child", 1, None),
+                ("move", 2, 0),
+                ("insert", 3, '<tr key="4"><td>row 4</td></tr>'),
+            ],
+        )
+        # without keys the rows are rewritten in place
+        unkeyed = diff(self.rows(range(4)), self.rows([3, 0, 2, 4]), keyed=False)
+        self.assertEqual({patch.op for patch in unkeyed}, {"text", "set"})
+
+    def test_snapshot_and_attributes(self):
+        tag = div(p("a", hidden=True), span("b"), id="app", cls="box")
+        old = snapshot(tag)
+        tag["class"] = "box open"
+        tag[0]["hidden"] = False
+        tag.remove(tag[1])
+        self.assertEqual(
+            diff(old, tag),
+            [
+                ("set", (), None, "class", "box open"),
+                ("remove_child", (), 1, None, None),
+                ("remove", (0,), None, "hidden", None),
+            ],
+        )
+
+    def test_htmx_fragments(self):
+        new = self.rows(range(3), changed=1)
+        patches = diff(self.rows(range(3)), new)
+        fragment = patches_to_htmx(patches, new)
+        self.assertTrue(fragment.startswith('<tbody hx-swap-oob="true" id="rows">'))
+        self.assertIn("<td>changed</td>", fragment)
+        with self.assertRaises(ValueError):
+            patches_to_htmx(diff(p("a"), p("b")), p("b"))
+
+
+class TestClone(unittest.TestCase):
+    def test_copies_structure(self):
+        source = div(p("text", data={"a": [1]}), span(), id="box")
+        source.__render__()
+        clone = source.clone()
+        self.assertIsNone(clone.parent)
+        self.assertEqual(clone.__render__(), source.__render__())
+        self.assertIsNot(clone[0], source[0])
+        self.assertIs(clone[0].parent, clone)
+        self.assertIs(clone[0][0], source[0][0])
+        self.assertIsNot(clone[0]["data"], source[0]["data"])
+
+        clone[0].add("more")
+        clone["id"] = "other"
+        self.assertNotIn("more", source.__render__())
+        self.assertIn('id="box"', source.__render__())
+
+    def test_component_and_document(self):
+        class Card(Component):
+            def render(self, title):
+                return div(h1(title), cls="card")
+
+        card = Card("title")
+        clone = card.clone()
+        self.assertIs(clone._entry, clone._children[0])
+        clone.add("body")
+        self.assertNotIn("body", card.__render__())
+
+        root = div(p(id="item"))
+        root.index_document()
+        copied = root.clone()
+        self.assertIs(copied.document, copied)
+        self.assertIs(copied.getElementById("item"), copied[0])
+        self.assertIs(root.getElementById("item"), root[0])
+
+    def test_decorator(self):
+        @ul(cls="list")
+        def items(*names):
+            for name in names:
+                li(name)
+
+        first, second = items("a"), items("b", "c")
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 2)
+        self.assertEqual(first["class"], "list")
+
+
+class TestCompiledComponent(unittest.TestCase):
+    class Card(Component):
+        def render(self, title, count=0, href="#"):
+            return div(
+                h1(title, cls="title"),
+                p(f"{count} items"),
+                a("more", href=href),
+                cls="card",
+            )
+
+    def test_matches_render(self):
+        compiled = self.Card.compile()
+        self.assertIs(self.Card.compile(), compiled)
+        for args, kwargs in (
+            (("title",), {}),
+            (("<b>",), {"count": 3, "href": 'a"b'}),
+            (("x",), {"href": "/y"}),
+        ):
+            self.assertEqual(
+                compiled.render(*args, **kwargs),
+                self.Card(*args, **kwargs).__render__(pretty=False),
+            )
+        self.assertTrue(all(compiled.plans.values()))
+
+    def test_falls_back(self):
+        class Branch(Component):
+            def render(self, title):
+                return div(title if title else "untitled")
+
+        class Loop(Component):
+            def render(self, items):
+                return ul(*[li(item) for item in items])
+
+        class Upper(Component):
+            def render(self, title):
+                return div(title.upper())
+
+        for component, value in ((Branch, ""), (Loop, "ab"), (Upper, "ab")):
+            compiled = component.compile()
+            self.assertEqual(
+                compiled.render(value), component(value).__render__(pretty=False)
+            )
+            self.assertEqual(list(compiled.plans.values()), [None])
+
+        # tags are not placed as text
+        html = self.Card.compile().render(span("tag"))
+        self.assertIn("<h1 class=\"title\"><span>tag</span></h1>", html)
+
+    def test_transformed_arguments(self):
+        class Lower(Component):
+            def render(self, title):
+                return div(title.lower())
+
+        class Slug(Component):
+            def render(self, slug):
+                return a("link", href="/p/" + slug.replace(" ", "-"))
+
+        class Strip(Component):
+            def render(self, title):
+                return h1(title.strip(), title=f"{title:>8}")
+
+        class Double(Component):
+            def render(self, n):
+                return span(str(n * 2))
+
+        for component, value in (
+            (Lower, "HeLLo"),
+            (Slug, "a b"),
+            (Strip, "  x  "),
+            (Double, 3),
+            (Double, 1.5),
+            (Double, "ab"),
+        ):
+            compiled = component.compile()
+            self.assertEqual(
+                compiled.render(value), component(value).__render__(pretty=False)
+            )
+            self.assertEqual(list(compiled.plans.values()), [None])
+
+    def test_with_block(self):
+        with div() as root:
+            self.Card.compile()("one")
+            self.Card.compile()("two")
+        self.assertEqual(len(root), 2)
+        self.assertIn("<h1 class=\"title\">two</h1>", root.__render__())
+
+    def test_class_argument(self):
+        class Box(Component):
+            def render(self, cls):
+                return div("x", cls=cls)
+
+        compiled = Box.compile()
+        cls = """
+            flex  items-center
+            text-<sm>
+        """
+        self.assertEqual(compiled.render(cls), Box(cls).__render__(pretty=False))
+        self.assertTrue(all(compiled.plans.values()))
+        self.assertEqual(compiled.render("a"), '<div class="a">x</div>')
+
+
+class TestRenderMemo(unittest.TestCase):
+    def setUp(self):
+        self.calls = calls = []
+
+        @memoize_render(maxsize=2, tags=lambda title, **kwargs: [f"title:{title}"])
+        class Card(Component):
+            def render(self, title, cls="card"):
+                calls.append(title)
+                return div(h1(title), cls=cls)
+
+        self.Card = Card
+
+    def test_hits_insert_into_with_block(self):
+        with div() as root:
+            first = self.Card("a")
+            second = self.Card("a")
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(self.Card.memo.info()[:2], (1, 1))
+        self.assertEqual(len(root), 2)
+        self.assertIs(second.parent, root)
+        self.assertIsNot(second._entry, first._entry)
+        self.assertEqual(first.__render__(), second.__render__())
+
+        # the kept render doesn't follow changes made to a component
+        first.add("changed")
+        self.assertNotIn("changed", self.Card("a").__render__())
+
+    def test_bounds_and_invalidation(self):
+        self.Card("a"), self.Card("b"), self.Card("c")
+        self.assertEqual(self.Card.memo.info().currsize, 2)
+        self.Card("a")
+        self.assertEqual(self.calls, ["a", "b", "c", "a"])
+
+        self.assertTrue(self.Card.invalidate_render("a"))
+        self.assertEqual(self.Card.memo.invalidate(tag="title:c"), 1)
+        self.Card("c")
+        self.assertEqual(self.calls[-1], "c")
+
+        # unhashable arguments are never kept
+        self.Card("d", cls=["x"])
+        self.Card("d", cls=["x"])
+        self.assertEqual(self.calls[-2:], ["d", "d"])
+
+    def test_ttl(self):
+        self.Card.memo.ttl = 0
+        self.Card("a")
+        self.Card("a")
+        self.assertEqual(self.calls, ["a", "a"])
+
+
+class TestCachedFragment(unittest.TestCase):
+    def setUp(self):
+        self.backend = LocalCache(maxsize=8)
+        self.calls = []
+
+    def body(self):
+        self.calls.append(1)
+        li("one")
+        return li("two")
+
+    def page(self, **kwargs):
+        with ul() as root:
+            li("zero")
+            Cached("items", self.body, backend=self.backend, **kwargs)
+        return root
+
+    def test_skips_body_on_hit(self):
+        expected = ul(li("zero"), li("one"), li("two"))
+        for pretty in (True, False):
+            self.assertEqual(
+                self.page().__render__(pretty=pretty),
+                expected.__render__(pretty=pretty),
+            )
+            self.assertEqual(
+                self.page().__render__(pretty=pretty),
+                expected.__render__(pretty=pretty),
+            )
+        # once for every way of rendering
+        self.assertEqual(len(self.calls), 2)
+
+    def test_vary_and_ttl(self):
+        self.page(vary=["en"]).__render__()
+        self.page(vary=["fr"]).__render__()
+        self.page(vary=["en"]).__render__()
+        self.assertEqual(len(self.calls), 2)
+
+        self.page(ttl=0).__render__()
+        self.page(ttl=0).__render__()
+        self.assertEqual(len(self.calls), 4)
+
+        self.backend.clear()
+        self.page(vary=["en"]).__render__()
+        self.assertEqual(len(self.calls), 5)
+
+    def test_keys_dont_collide(self):
+        keys = {
+            Cached(key, self.body, vary=vary).cache_key()
+            for key, vary in (("a|b", ()), ("a", ("b",)), ("a", ("b", "")), ("a", ()))
+        }
+        self.assertEqual(len(keys), 4)
+
+
+class TestFreeze(unittest.TestCase):
+    def navbar(self):
+        return nav(ul(li(a("home", href="/")), li(a("about", href="/about"))))
+
+    def test_renders_like_the_tags(self):
+        frozen = self.navbar().freeze()
+        for pretty in (True, False):
+            self.assertEqual(
+                div(div(p("x"), frozen), frozen).__render__(pretty=pretty),
+                div(div(p("x"), self.navbar()), self.navbar()).__render__(
+                    pretty=pretty
+                ),
+            )
+
+    def test_immutable_and_shared(self):
+        tags = self.navbar()
+        frozen = tags.freeze()
+        tags.add(p("later"))
+        self.assertNotIn("later", frozen.__render__())
+
+        first, second = div(frozen), div(frozen)
+        self.assertIsNone(frozen.parent)
+        self.assertEqual(first.__render__(), second.__render__())
+        for change in (
+            lambda: frozen.add(p()),
+            lambda: frozen.set_attribute("id", "x"),
+            lambda: frozen.attributes.update(id="x"),
+            lambda: frozen.clear(),
+        ):
+            with self.assertRaises(TypeError):
+                change()
+
+    def test_get_skips_frozen_tags(self):
+        root = div(self.navbar().freeze(), a("other"))
+        self.assertEqual(len(root.get(a)), 1)
+        self.assertEqual(len(root.get(a, frozen=True)), 3)
+        self.assertEqual(root.get(a, frozen=True, href="/about")[0][0], "about")
+
+    def test_tree_changes_dont_render(self):
+        frozen = self.navbar().freeze()
+        self.assertEqual(frozen.__render__(), self.navbar().__render__())
+        frozen.tree.add(p("changed"))
+        with self.assertRaises(AttributeError):
+            frozen.tree = p("changed")
+        # the other indentations are rendered after the change
+        self.assertEqual(
+            div(div(frozen)).__render__(), div(div(self.navbar())).__render__()
+        )
+
+
+class TestAsyncRender(unittest.TestCase):
+    def render(self, tag):
+        async def collect():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            html = "".join([chunk async for chunk in tag.__async_render__()])
+            self.elapsed = loop.time() - start
+            return html
+
+        return asyncio.run(collect())
+
+    def test_async_components_resolve_concurrently(self):
+        class Widget(Component):
+            async def render(self, n):
+                await asyncio.sleep(0.05)
+                return div(f"widget {n}", cls="widget")
+
+        with div() as page:
+            for n in range(10):
+                with Widget(n):
+                    span("extra")
+        html = self.render(page)
+        # the widgets wait at once rather than one after the other
+        self.assertLess(self.elapsed, 0.3)
+
+        expected = div(
+            *[div(f"widget {n}", span("extra"), cls="widget") for n in range(10)]
+        )
+        self.assertEqual(html, expected.__render__())
+        self.assertEqual(len(page.get(span)), 10)
+
+    def test_checked_async_component(self):
+        class Store(Component):
+            def __checks__(self, element):
+                assert "x-data" in element.attributes, "x-data is required"
+
+            async def render(self, data):
+                await asyncio.sleep(0)
+                return div("store", x_data=data)
+
+        # checked once the render is awaited, not on the pending entry
+        store = Store("{}")
+        self.assertIn("x-data", self.render(store))
+
+    def test_awaitable_children(self):
+        async def rows():
+            await asyncio.sleep(0)
+            return ul(li("a"), asyncio.sleep(0, result="nested"))
+
+        page = div(rows(), Await(asyncio.sleep(0, result="text")))
+        self.assertEqual(
+            self.render(page), div(ul(li("a"), "nested"), "text").__render__()
+        )
+
+        pending = div(Await(asyncio.sleep(0, result="late")))
+        with self.assertRaises(RuntimeError):
+            pending.__render__()
+        self.assertIn("late", self.render(pending))
+
+    def test_reactive_component(self):
+        @dataclass(eq=False)
+        class Counter(ReactiveComponent):
+            count: int
+
+            def __post_init__(self):
+                super(Counter, self).__init__(count=self.count)
+
+            async def render(self, count):
+                await asyncio.sleep(0)
+                return p(f"count {count}")
+
+        counter = Counter(1)
+        self.assertIn("count 1", self.render(counter))
+        counter.count += 1
+        self.assertIn("count 2", self.render(counter))
+
+    def test_streams_up_to_pending(self):
+        from uidom.response.starlette import StreamingResponse
+
+        async def late():
+            await asyncio.sleep(0.2)
+            return p("late")
+
+        def page():
+            return div(h1("title"), Await(late()), p("footer"))
+
+        async def collect(pretty):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            chunks = []
+            async with anyio.create_task_group() as tasks:
+                tag = page()
+                async for chunk in tag.__async_render__(
+                    pretty=pretty, task_group=tasks
+                ):
+                    chunks.append((loop.time() - start, chunk))
+            return chunks
+
+        for pretty in (False, True):
+            chunks = asyncio.run(collect(pretty))
+            first_at, first = chunks[0]
+            # the html before the awaitable doesn't wait on it
+            self.assertLess(first_at, 0.1)
+            self.assertIn("title", first)
+            self.assertNotIn("late", first)
+            self.assertEqual(
+                "".join(chunk for _, chunk in chunks),
+                div(h1("title"), p("late"), p("footer")).__render__(pretty=pretty),
+            )
+
+        pending = page()
+        with self.assertRaises(RuntimeError):
+            pending.render_into(BytesIO())
+        pending.get(Await)[0].awaitable.close()
+
+        async def respond():
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await StreamingResponse(page()).stream_response(send)
+            return b"".join(message.get("body", b"") for message in messages)
+
+        self.assertEqual(
+            asyncio.run(respond()),
+            div(h1("title"), p("late"), p("footer")).__render__(pretty=False).encode(),
+        )
+
+
+class TestDeferred(unittest.TestCase):
+    def stream(self, tag):
+        async def collect():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            chunks = []
+            async with anyio.create_task_group() as tasks:
+                async for chunk in tag.__async_render__(
+                    pretty=False, task_group=tasks
+                ):
+                    chunks.append((loop.time() - start, chunk))
+            return chunks
+
+        return asyncio.run(collect())
+
+    def test_fallback_streamed_first(self):
+        async def chart():
+            await asyncio.sleep(0.1)
+            return span("chart")
+
+        with div(cls="page") as page:
+            h1("Sales")
+            Deferred(chart(), p("loading"), cls="chart", id="sales")
+            p("footer")
+        chunks = self.stream(page)
+
+        first_at, shell = chunks[0]
+        # the page doesn't wait on the deferred tag
+        self.assertLess(first_at, 0.05)
+        self.assertEqual(
+            shell,
+            '<div class="page"><h1>Sales</h1><div class="chart" id="sales">'
+            "<p>loading</p></div><p>footer</p></div>",
+        )
+        last_at, swap = chunks[-1]
+        self.assertGreaterEqual(last_at, 0.09)
+        self.assertEqual(
+            swap,
+            '<template id="sales-content"><span>chart</span></template>'
+            '<script>uidomSwap("sales")</script>',
+        )
+        self.assertEqual(chunks[1][1], Deferred.swap_script)
+        # any other render shows the fallback
+        self.assertEqual(page.__render__(pretty=False), shell)
+
+    def test_sent_as_resolved(self):
+        async def widget(delay, name):
+            await asyncio.sleep(delay)
+            if name == "outer":
+                return Deferred(widget(0, "inner"), "wait", id="inner")
+            return name
+
+        page = div(
+            Deferred(widget(0.05, "slow"), id="slow"),
+            Deferred(widget(0, "outer"), id="outer"),
+        )
+        html = "".join(chunk for _, chunk in self.stream(page))
+        ids = ["outer", "inner", "slow"]
+        positions = [html.index(f'uidomSwap("{id_}")') for id_ in ids]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn(
+            '<template id="outer-content"><div id="inner">wait</div></template>', html
+        )
+
+    def test_failure_keeps_fallback(self):
+        async def broken():
+            await asyncio.sleep(0)
+            raise ValueError("backend down")
+
+        async def chart():
+            await asyncio.sleep(0.01)
+            return "chart"
+
+        page = div(
+            Deferred(broken(), "loading", id="broken"),
+            Deferred(chart(), "loading", id="chart"),
+        )
+        with self.assertLogs("uidom.dom.src.awaitable", "ERROR") as logs:
+            html = "".join(chunk for _, chunk in self.stream(page))
+        self.assertIn("backend down", "".join(logs.output))
+        self.assertIn('<div id="broken">loading</div>', html)
+        self.assertNotIn('uidomSwap("broken")', html)
+        self.assertIn(
+            '<template id="chart-content">chart</template>'
+            '<script>uidomSwap("chart")</script>',
+            html,
+        )
+
+    def test_generated_ids(self):
+        first = Deferred(asyncio.sleep(0))
+        second = Deferred(asyncio.sleep(0))
+        self.assertNotEqual(first["id"], second["id"])
+        for tag in (first, second):
+            asyncio.run(tag.awaitable)
+
+
+class TestDeepTree(unittest.TestCase):
+    depth = 2000
+
+    def test_render_deep_tree(self):
+        root = node = div()
+        for _ in range(self.depth):
+            node = node.add(div())
+        node.add(span("leaf"))
+
+        self.assertEqual(root.__render__().count("<div>"), self.depth + 1)
+        self.assertEqual(
+            root.__render__(pretty=False),
+            "<div>" * (self.depth + 1)
+            + "<span>leaf</span>"
+            + "</div>" * (self.depth + 1),
+        )
+        self.assertEqual(len(root.get(span)), 1)
+
+    def test_with_deep_tree(self):
+        with ExitStack() as stack:
+            root = stack.enter_context(div())
+            for _ in range(self.depth):
+                stack.enter_context(div())
+            span("leaf")
+
+        self.assertEqual(len(root.get(div)), self.depth)
+        self.assertIn("<span>leaf</span>", root.__render__(pretty=False))
+
+    def test_render_deep_dom_tag_tree(self):
+        from uidom.dom.src.dom_tag import dom_tag
+
+        root = node = dom_tag()
+        for _ in range(self.depth):
+            node = node.add(dom_tag())
+        node.add("leaf")
+
+        self.assertEqual(root.__render__().count("</dom_tag>"), self.depth + 1)
+        html = root.__render__(pretty=False)
+        self.assertEqual(html.count("<dom_tag>"), self.depth + 1)
+        self.assertIn("<dom_tag>leaf</dom_tag>", html)
+
+    def test_nested_self_rendering_tags(self):
+        from uidom.dom.src.cached import LocalCache
+
+        def nested(depth):
+            def body():
+                if depth:
+                    Cached(depth, nested(depth - 1), backend=LocalCache())
+                else:
+                    span("leaf")
+
+            return body
+
+        shallow = Cached("top", nested(10), backend=LocalCache())
+        self.assertIn("<span>leaf</span>", div(shallow).__render__(pretty=False))
+        deep = Cached("top", nested(self.depth), backend=LocalCache())
+        with self.assertRaisesRegex(RuntimeError, "nested more than"):
+            div(deep).__render__()
+
+
 # class TestDocumentHead(unittest.TestCase):
 #     def setUp(self) -> None:
 #         self.document = HtmlDocument
@@ -10,11 +10,17 @@ from .htmldocument import *  # isort: skip
 from .icons import *  # isort: skip
 from .jinja import *  # isort: skip
 
+from .src.awaitable import *
+from .src.cached import *
+from .src.compiled import *
 from .src.component import *
 from .src.csstags import *
+from .src.deferred import *
 from .src.ext import *
+from .src.frozen import *
 from .src.htmltags import *
 from .src.jinjatags import *
+from .src.memo import *
 from .src.svgtags import *
 
 from .src.utils import *  # isort: skip
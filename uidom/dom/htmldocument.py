@@ -32,10 +32,12 @@ class Body(component.Component):
 class HtmlDocument(component.Component):
     csrf_field = "X-CSRF-TOKEN"
     ensure_csrf_token: bool = field(default=True, init=False)
+    # keeps an index of the tags in the document for id and attribute lookups
+    index_tags: bool = field(default=True, init=False)
 
     def __init__(self, *args, **kwargs):
         self.ensure_csrf_token = kwargs.pop("ensure_csrf_token", self.ensure_csrf_token)
-        self.document = self
+        self.index_tags = kwargs.pop("index_tags", self.index_tags)
         super(HtmlDocument, self).__init__(*args, **kwargs)
         self._entry = self.body
         self._old_entry = None
@@ -95,7 +97,13 @@ class HtmlDocument(component.Component):
 
     def __checks__(self, element):
         if self.ensure_csrf_token:
-            token_element = element.get(name=self.csrf_field)
+            index = element._indexed()
+            if index is not None:
+                token_element = element._under(
+                    index.with_attribute("name", self.csrf_field)
+                )
+            else:
+                token_element = element.get(name=self.csrf_field)
             if not token_element:
                 raise AttributeError(
                     f"{self.__class__.__qualname__} {self.csrf_field} must be set"
@@ -118,6 +126,13 @@ class HtmlDocument(component.Component):
         head = [head] if not isinstance(head, list) else head
         body = [body] if not isinstance(body, list) else body
 
+        # the document is set before the tree below gets added to it, so every
+        # tag is indexed as it comes in
+        if self.index_tags:
+            self.index_document()
+        else:
+            self.setdocument(self)
+
         doc = self.html_tags.DocType("html")
         with self.html_tags.html() as self.html:
             # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++ #
@@ -178,11 +193,11 @@ class HtmlDocument(component.Component):
             # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++ #
             # $Body Section
             # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++ #
-        if not self.head.get("meta", charset="utf-8"):
+        if self.head.find_first("meta", charset="utf-8") is None:
             charset = self.html_tags.meta(charset="utf-8")
             self.head.add(charset)
 
-        if not self.head.get("meta", name="viewport"):
+        if self.head.find_first("meta", name="viewport") is None:
             viewport_meta = self.html_tags.meta(
                 name="viewport",
                 content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no, minimal-ui",
@@ -191,8 +206,8 @@ class HtmlDocument(component.Component):
 
         return doc, self.html
 
-    def _render(self, sb, indent_level=1, indent_str="  ", pretty=True, xhtml=False):
+    def _before_render(self):
         self._may_shift_Head_to_head()
         self._may_shift_Body_to_body()
         self._may_add_xelement_to_xelement_placeholder()
-        return super()._render(sb, indent_level, indent_str, pretty, xhtml)
+        super()._before_render()
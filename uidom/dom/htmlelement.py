@@ -164,13 +164,13 @@ class WebComponent(XElement):
         try:
             shadow_root_attr = element["shadowroot"]
         except AttributeError:
-            shadow_root_attr = element.get(shadowroot=None)
+            shadow_root_attr = element.find_first(shadowroot=None) is not None
 
         if not shadow_root_attr:
             try:
                 shadow_root_attr = element["shadowdom"]
             except AttributeError:
-                shadow_root_attr = element.get(shadowdom=None)
+                shadow_root_attr = element.find_first(shadowdom=None) is not None
 
         if not shadow_root_attr:
             raise AttributeError(
@@ -200,7 +200,7 @@ class AlpineElement(component.Component):
         try:
             x_data_attr = element["x-data"]
         except AttributeError:
-            x_data_attr = element.get(x_data=None)
+            x_data_attr = element.find_first(x_data=None) is not None
 
         if not x_data_attr:
             raise AttributeError(
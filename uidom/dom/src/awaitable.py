@@ -0,0 +1,131 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import logging
+import math
+
+import anyio
+
+from uidom.dom.src.deferred import Deferred
+from uidom.dom.src.ext import PlaceholderTag
+
+__all__ = ["Await"]
+
+logger = logging.getLogger(__name__)
+
+
+class Await(PlaceholderTag):
+    """
+    A child whose content is an awaitable (ex. the coroutine of a data backed
+    widget). __async_render__ awaits every Await of the tree at once before the
+    html is rendered, and the tags or strings it returns take its place. Adding
+    an awaitable to a tag wraps it in an Await.
+
+        with div(cls="dashboard") as page:
+            for widget in widgets:
+                Await(widget.load())
+        async for chunk in page.__async_render__():
+            ...
+
+    Rendering an Await that wasn't awaited raises RuntimeError.
+    """
+
+    def __init__(self, awaitable, *args, **kwargs):
+        super(Await, self).__init__(*args, **kwargs)
+        self.awaitable = awaitable
+
+    @property
+    def is_pending(self):
+        return self.awaitable is not None
+
+    async def _resolve(self):
+        # still pending while it is awaited, the streamed render waits for it
+        result = await self.awaitable
+        self.awaitable = None
+        if result is not None:
+            self.add(result)
+
+    def _before_render(self):
+        if self.awaitable is not None:
+            raise RuntimeError(
+                f"{self!r} is not awaited yet, render the tree with __async_render__"
+                " (StreamingResponse) or await resolve_awaitables() first"
+            )
+        super(Await, self)._before_render()
+
+
+async def stream_pending(
+    tag,
+    send,
+    pending,
+    deferred,
+    indent="  ",
+    pretty=True,
+    xhtml=False,
+    chunk_size=16 * 1024,
+):
+    """
+    Renders tag into the send stream of chunks (see dom_tag.__async_render__).
+    The pending tags and the Deferred ones, as found under tag, are all awaited
+    at once: the html is sent up to the first tag still pending, and after the
+    page the html of the Deferred tags in the order they resolve.
+    """
+    resolved = {}
+    swaps_send, swaps = anyio.create_memory_object_stream(math.inf)
+    # Deferred tags started and not sent yet
+    left = 0
+
+    def defer(node):
+        nonlocal left
+        left += 1
+        tasks.start_soon(resolve_deferred, node)
+
+    async def resolve(node):
+        await node._resolve()
+        for child in await node.resolve_awaitables():
+            defer(child)
+        resolved[id(node)].set()
+
+    async def resolve_deferred(node):
+        try:
+            nested = await node._resolve()
+            html = "".join(node.content._render([], 0, indent, pretty, xhtml))
+        except Exception:
+            # the page is already sent, the fallback stays in place of the tag
+            # rather than ending the response
+            logger.exception("%r failed, its fallback is kept", node)
+            swaps_send.send_nowait("")
+            return
+        # queued before the nested ones can run so it is swapped in first
+        swaps_send.send_nowait(node._swap_html(html))
+        for child in nested:
+            defer(child)
+
+    async with send, anyio.create_task_group() as tasks:
+        for node in pending:
+            resolved[id(node)] = anyio.Event()
+            tasks.start_soon(resolve, node)
+        for node in deferred:
+            defer(node)
+        try:
+            for chunk in tag._render_chunks(indent, pretty, xhtml, chunk_size, True):
+                if isinstance(chunk, str):
+                    await send.send(chunk)
+                elif id(chunk) in resolved:
+                    await resolved[id(chunk)].wait()
+                else:
+                    # brought by a tag that updated itself while rendered
+                    for child in await chunk.resolve_awaitables():
+                        defer(child)
+            if left:
+                await send.send(Deferred.swap_script)
+            while left:
+                left -= 1
+                html = await swaps.receive()
+                if html:
+                    await send.send(html)
+        except anyio.BrokenResourceError:
+            # the chunks are no longer read, the response was closed
+            tasks.cancel_scope.cancel()
@@ -0,0 +1,126 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import threading
+import time
+from collections import OrderedDict
+
+from uidom.dom.src.dom_tag import _with_stack, dom_tag
+from uidom.dom.src.ext import PlaceholderTag
+
+__all__ = ["Cached", "LocalCache"]
+
+
+class LocalCache(object):
+    """
+    In-process cache of rendered fragments, the least recently used ones are
+    dropped past maxsize. Any object with the same get, set and delete methods
+    can be the backend of Cached (ex. a wrapper of django or redis caches).
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the value kept under key, None if there is none or it expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Cached(dom_tag):
+    """
+    Renders the tags built by body once and keeps the html in a cache, like the
+    cache tag of django templates. While the html is kept body isn't called, so
+    neither building nor rendering the tags is paid for. The html is kept under
+    key, the values of vary (ex. the language or the user) and the way the page
+    is rendered (pretty, indentation).
+
+        with div(cls="page"):
+            Cached("sidebar", build_sidebar, ttl=60, vary=[user.id])
+
+    body is called with no arguments, the tags it creates in the with block are
+    the fragment, as are the tags or strings it returns. The tags of the fragment
+    are not part of the tree, get and find don't see them.
+    """
+
+    # the html can change without the tree changing (ttl, another process)
+    is_cacheable = False
+    # the cache of every Cached that doesn't have its own
+    backend = LocalCache()
+
+    def __init__(self, key, body, ttl=None, vary=(), backend=None):
+        super(Cached, self).__init__()
+        self.key = key
+        self.body = body
+        self.ttl = ttl
+        self.vary = tuple(vary)
+        if backend is not None:
+            self.backend = backend
+
+    def cache_key(self, indent_level=0, indent_str="  ", pretty=True, xhtml=False):
+        render = self._render_cache_key(indent_level, indent_str, pretty, xhtml)
+        # the repr of a tuple quotes every part, so no two of them run together
+        # (ex. the key "a|b" and the key "a" varying on "b")
+        parts = ("uidom", str(self.key), tuple(map(str, self.vary)), render)
+        return repr(parts)
+
+    def build(self):
+        """
+        Calls body and returns the fragment it built.
+        """
+        # the fragment is built apart from the with blocks that are open
+        token = _with_stack.set(())
+        try:
+            with PlaceholderTag() as fragment:
+                result = self.body()
+        finally:
+            _with_stack.reset(token)
+        if result is not None and result is not fragment:
+            if not isinstance(result, dom_tag) or result.parent is not fragment:
+                fragment.add(result)
+        return fragment
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        pretty = pretty and self.is_pretty
+        key = self.cache_key(indent_level, indent_str, pretty, xhtml)
+        html = self.backend.get(key)
+        if html is None:
+            html = "".join(
+                self.build()._render([], indent_level, indent_str, pretty, xhtml)
+            )
+            self.backend.set(key, html, self.ttl)
+        sb.append(html)
+        return sb
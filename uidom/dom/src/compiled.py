@@ -0,0 +1,205 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import re
+import typing
+
+from uidom.dom.src.dom_tag import _with_stack
+from uidom.dom.src.ext import _normalize_class
+from uidom.dom.src.utils.dom_util import escape, raw
+
+__all__ = ["CompiledComponent"]
+
+
+class _Dynamic(Exception):
+    """
+    The render of a component looked at an argument rather than placing it.
+    """
+
+
+class _Slot(str):
+    """
+    Stands for an argument while a component is traced. It can only be placed in
+    the text and attributes of the tags and formatted into strings, any other
+    use (truth, length, iteration, comparisons, string methods and operators)
+    raises _Dynamic as the html would depend on its value.
+    """
+
+    def _dynamic(self, *args, **kwargs):
+        raise _Dynamic(str.__str__(self))
+
+    def __eq__(self, other):
+        if other is None:
+            # rendering checks attribute values against None
+            return False
+        raise _Dynamic(str.__str__(self))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = str.__hash__
+
+    def __format__(self, format_spec):
+        if format_spec:
+            # padding, alignment and truncation change the text
+            raise _Dynamic(str.__str__(self))
+        return str.__str__(self)
+
+    def _as_class(self):
+        """
+        Returns the slot marked as a class attribute value, which is normalized
+        when the argument is placed (see ext._normalize_class).
+        """
+        return _Slot(str.__str__(self).replace("&", "c&", 1))
+
+
+# the str methods that keep the text as it is, the others raise _Dynamic
+_placing = {
+    "__class__",
+    "__delattr__",
+    "__dir__",
+    "__doc__",
+    "__eq__",
+    "__format__",
+    "__getattribute__",
+    "__getnewargs__",
+    "__getstate__",
+    "__hash__",
+    "__init__",
+    "__init_subclass__",
+    "__ne__",
+    "__new__",
+    "__reduce__",
+    "__reduce_ex__",
+    "__setattr__",
+    "__sizeof__",
+    "__str__",
+    "__subclasshook__",
+}
+for _name in dir(str):
+    if _name not in _placing and callable(getattr(str, _name)):
+        setattr(_Slot, _name, _Slot._dynamic)
+del _name
+
+
+# a slot is "\ue000s<number>&<trace>\ue001" (private use characters around it),
+# the "&" tells escaped slots apart, a "c" before it the values of class
+# attributes and the letters of the trace change if the render transforms the
+# text (ex. upper)
+_mark = "\ue000"
+_slot = re.compile("\ue000s([0-9]+)(c)?&(amp;)?([a-z]+)\ue001")
+_traces = ("first", "second")
+
+# argument values that are placed as their text, other values (numbers, tags,
+# booleans, None, containers) are rendered the normal way, a number can't be
+# traced as a string since the render may compute with it
+_placeable = (str,)
+
+
+class CompiledComponent(object):
+    """
+    Renders a component as static html segments joined with the text of its
+    arguments. The first call with a given set of arguments traces the render of
+    the component with stand-ins for the arguments and keeps the html around
+    them, the next ones are a few string concatenations instead of building and
+    walking the tags.
+
+    The render falls back to the component when its html depends on the value
+    of the arguments (the render branches on them, loops over them or transforms
+    them with string methods or operators) or when an argument is not a string.
+    Components whose render depends on anything else than the arguments
+    shouldn't be compiled.
+
+        card = Card.compile()
+        html = card.render("title", body="text")
+        with div():
+            card("title", body="text")  # adds the html like a tag
+    """
+
+    def __init__(self, component):
+        self.component = component
+        # (number of positional arguments, keyword names) -> plan or None
+        self.plans: typing.Dict[tuple, typing.Optional[tuple]] = {}
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {self.component.__qualname__}>"
+
+    def __call__(self, *args, **kwargs):
+        """
+        Adds the html of the component to the current with block, as a tag would.
+        """
+        return raw(self.render(*args, **kwargs))
+
+    def render(self, *args, **kwargs) -> str:
+        """
+        Returns the minified html of the component for the arguments.
+        """
+        shape = (len(args), tuple(sorted(kwargs)))
+        try:
+            plan = self.plans[shape]
+        except KeyError:
+            plan = self.plans[shape] = self._trace(*shape)
+
+        if plan is None or not all(
+            type(value) in _placeable for value in (*args, *kwargs.values())
+        ):
+            return self._render(*args, **kwargs)
+
+        statics, slots = plan
+        parts = [statics[0]]
+        for (key, escaped, is_class), static in zip(slots, statics[1:]):
+            value = args[key] if isinstance(key, int) else kwargs[key]
+            value = _normalize_class(value) if is_class else str(value)
+            parts.append(escape(value) if escaped else value)
+            parts.append(static)
+        return "".join(parts)
+
+    def _render(self, *args, **kwargs):
+        # the component is rendered apart from the with blocks that are open, the
+        # html is what joins them
+        token = _with_stack.set(())
+        try:
+            return self.component(*args, **kwargs).__render__(pretty=False)
+        finally:
+            _with_stack.reset(token)
+
+    def _trace(self, count, names):
+        """
+        Returns the plan of the component for the positional count and keyword
+        names of arguments, (statics, slots) where slots are (key, escaped) and
+        the html is statics[0] + slot + statics[1] + ... or None if the render
+        can't be compiled.
+        """
+        component = self.component
+        if not component.is_cacheable or getattr(
+            component, "string_is_markdown", False
+        ):
+            return None
+        keys = list(range(count)) + list(names)
+        plans = []
+        for trace in _traces:
+            slots = [_Slot(f"{_mark}s{i}&{trace}\ue001") for i in range(len(keys))]
+            try:
+                html = self._render(*slots[:count], **dict(zip(names, slots[count:])))
+            except Exception:
+                # _Dynamic, or an argument used as something it isn't in a trace
+                return None
+            parts = _slot.split(html)
+            statics = parts[::5]
+            if any(_mark in static for static in statics):
+                # a slot was transformed by the render
+                return None
+            if any(name != trace for name in parts[4::5]):
+                return None
+            holes = tuple(
+                (keys[int(index)], escaped is not None, is_class is not None)
+                for index, is_class, escaped in zip(
+                    parts[1::5], parts[2::5], parts[3::5]
+                )
+            )
+            plans.append((tuple(statics), holes))
+        if plans[0] != plans[1]:
+            return None
+        return plans[0]
@@ -5,9 +5,11 @@
 
 from __future__ import annotations
 
+import copy
+import inspect
 import json
 import warnings
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from html import unescape
 from pathlib import Path
 from textwrap import dedent
@@ -16,6 +18,8 @@ from typing import Iterable, List, Union
 from marko import convert as markdown
 
 from uidom.dom.src import csstags, htmltags, jinjatags, svgtags
+from uidom.dom.src.awaitable import Await
+from uidom.dom.src.compiled import CompiledComponent
 from uidom.dom.src.dom_tag import dom_tag
 from uidom.dom.src.html_string import defHTML
 from uidom.dom.src.main import extension
@@ -24,6 +28,23 @@ from uidom.utils.parameters import Parameters
 __all__ = ["Component", "ReactiveComponent", "Fragment", "MergeClassAttribute"]
 
 
+def _asdict_value(value):
+    """
+    Converts a field value the way dataclasses.asdict converts the fields.
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*[_asdict_value(v) for v in value])
+    if isinstance(value, (list, tuple)):
+        return type(value)(_asdict_value(v) for v in value)
+    if isinstance(value, dict):
+        return type(value)(
+            (_asdict_value(k), _asdict_value(v)) for k, v in value.items()
+        )
+    return copy.deepcopy(value)
+
+
 @dataclass
 class Component(extension.Tags):
     left_delimiter = "<"
@@ -38,11 +59,11 @@ class Component(extension.Tags):
     children: List[Union[str, html_tags.dom_tag]] = field(
         init=False, default_factory=list
     )
-    parent: Union[html_tags.dom_tag, None] = field(init=False, default=None)
-    document: Union[html_tags.dom_tag, None] = field(init=False, default=None)
     files_directory: Union[str, Path, None] = field(init=False, default=None)
     escape_string: bool = field(init=False, default=True)
     string_is_markdown: bool = field(init=False, default=False)
+    # keeps the renders of the component by arguments when set, see RenderMemo
+    memo = None
 
     def __init__(self, *args, **kwargs):
         super(Component, self).__init__()
@@ -50,9 +71,62 @@ class Component(extension.Tags):
         global markdown
         markdown = kwargs.pop("markdown", None) or markdown
         markdown = getattr(markdown, "convert", markdown)
+
+        memo = self.memo
+        key = None if memo is None else memo.key(type(self), args, kwargs)
+        # a kept render is a clone, the component is added to the with block it
+        # is created in as usual and the clone is added to the component
+        child = None if key is None else memo.get(key)
+        if child is None:
+            child = self._render_entry(*args, **kwargs)
+            if key is not None and child is not self and not isinstance(child, Await):
+                memo.set(key, child, args, kwargs)
+
+        if isinstance(child, (list, tuple)) and len(child) == 1:
+            child = child[0]
+        # commented and shifted __init__ below to the first line because then Fragment can
+        # add *args and **kwargs on initialization inside render method
+        # super(Component, self).__init__()
+
+        if child is not self:
+            self.add(child)
+
+        self._entry = self if isinstance(child, (list, tuple)) else child
+
+        # we perform checks on the _entry "after" the dom initialization because .get method
+        # looks into children, an async entry is checked once it is awaited
+        if not isinstance(self._entry, Await):
+            self.__checks__(self._entry)
+
+    def _render_entry(self, *args, **kwargs):
         # first we get the child from the render method and sanitize it.
         child = self.render(*args, **kwargs)
+        if inspect.isawaitable(child):
+            # async render, the entry is known once __async_render__ awaits it
+            return Await(self._async_entry(child))
+        return self._clean_entry(child)
+
+    async def _async_entry(self, awaitable):
+        pending = self._entry
+        child = self._clean_entry(await awaitable)
+        if isinstance(child, (list, tuple)) and len(child) == 1:
+            child = child[0]
+        # the children added to the component meanwhile went to the Await, they
+        # move to the entry as they would have with a render that isn't async
+        added = list(pending._children)
+        pending.clear()
+        position = self._child_index(pending)
+        extension.Tags.remove(self, pending)
+        # without an entry the tags are added to the component itself
+        del self._entry
+        if child is not self:
+            extension.Tags.insert(self, position, child)
+        self._entry = self if isinstance(child, (list, tuple)) else child
+        if added:
+            self.add(*added)
+        self.__checks__(self._entry)
 
+    def _clean_entry(self, child):
         if child is None:
             raise ValueError(
                 f"{self.__class__.__name__} `render` method must return a value."
@@ -73,21 +147,7 @@ class Component(extension.Tags):
                     markdown(child) if self.escape_string else unescape(markdown(child))
                 )
             child = defHTML(child, escape=self.escape_string)
-
-        if isinstance(child, (list, tuple)) and len(child) == 1:
-            child = child[0]
-        # commented and shifted __init__ below to the first line because then Fragment can
-        # add *args and **kwargs on initialization inside render method
-        # super(Component, self).__init__()
-
-        if child is not self:
-            self.add(child)
-
-        self._entry = self if isinstance(child, (list, tuple)) else child
-
-        # we perform checks on the _entry "after" the dom initialization because .get method
-        # looks into children
-        self.__checks__(self._entry)
+        return child
 
     def __checks__(
         self, element: Union[dom_tag, extension.Tags]
@@ -104,6 +164,16 @@ class Component(extension.Tags):
             return self._entry.add(*args)
         return super().add(*args)
 
+    def insert(self, position, obj):
+        if not self.render_tag and hasattr(self, "_entry") and self._entry is not self:
+            return self._entry.insert(position, obj)
+        return super().insert(position, obj)
+
+    def _child_target(self):
+        if not self.render_tag and hasattr(self, "_entry") and self._entry is not self:
+            return self._entry._child_target()
+        return self
+
     def set_attribute(self, key, value):
         if not self.render_tag and hasattr(self, "_entry") and self._entry is not self:
             self._entry.set_attribute(key, value)
@@ -120,12 +190,12 @@ class Component(extension.Tags):
 
     __delitem__ = delete_attribute
 
-    def get(self, tag=None, **kwargs):
+    def get(self, tag=None, frozen=False, **kwargs):
         if not self.render_tag and hasattr(self, "_entry") and self._entry is not self:
             # try to get the attribute of the children of the component
-            return self._entry.get(tag, **kwargs)
+            return self._entry.get(tag, frozen, **kwargs)
         else:
-            return super(Component, self).get(tag, **kwargs)
+            return super(Component, self).get(tag, frozen, **kwargs)
 
     def __getitem__(self, key):
         if not self.render_tag:
@@ -202,7 +272,14 @@ class Component(extension.Tags):
             "escape_string",
             "string_is_markdown",
         ]
-        return {key: value for key, value in asdict(self).items() if key not in exclude}
+        # only the kept fields are converted, asdict(self) would also copy the
+        # children, parent and document fields along with the whole tree
+        # behind them
+        return {
+            f.name: _asdict_value(getattr(self, f.name))
+            for f in fields(self)
+            if f.name not in exclude
+        }
 
     def to_dict(self, exclude=None) -> dict:
         return self._asdict(exclude=exclude)
@@ -254,6 +331,27 @@ class Component(extension.Tags):
     def from_file(cls, file_name: Union[str, Path]) -> "Component":
         return cls(cls._from_file(file_name))
 
+    @classmethod
+    def invalidate_render(cls, *args, **kwargs) -> bool:
+        """
+        Drops the render kept in the memo of the component for the arguments.
+        """
+        if cls.memo is None:
+            return False
+        return bool(cls.memo.invalidate(key=cls.memo.key(cls, args, kwargs)))
+
+    @classmethod
+    def compile(cls) -> CompiledComponent:
+        """
+        Returns the compiled render of the component, see CompiledComponent.
+        """
+        compiled = cls.__dict__.get("_compiled")
+        if compiled is None:
+            compiled = CompiledComponent(cls)
+            # kept on the class itself so subclasses are compiled on their own
+            cls._compiled = compiled
+        return compiled
+
     def script(self, *args, **kwargs):
         ...
 
@@ -409,6 +507,9 @@ class MergeClassAttribute(Fragment):
 
 @dataclass(eq=False)
 class ReactiveComponent(Component):
+    # states are checked and re-rendered on every render
+    is_cacheable = False
+
     def __init__(self, *args, **kwargs):
         super(ReactiveComponent, self).__init__(*args, **kwargs)
         self.__states: dict = kwargs
@@ -467,7 +568,7 @@ class ReactiveComponent(Component):
         old_entry_children = self._entry.children
 
         if old_parent is not None:
-            index_of_entry = old_parent.children.index(self)
+            index_of_entry = old_parent._child_index(self)
 
         self.clear()
         # this self.clear is to clear any self._entry's childs that are present
@@ -489,6 +590,8 @@ class ReactiveComponent(Component):
             elements = self.render(**kwargs)
         else:
             elements = self.render()
+        if inspect.isawaitable(elements):
+            elements = Await(self._async_entry(elements))
         self._entry = extension.Tags.add(
             self, elements
         )  ## <--- important to call Tags .add method
@@ -522,6 +625,11 @@ class ReactiveComponent(Component):
 
     __setitem__ = set_attribute
 
-    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+    def _before_render(self):
+        self._check_states_and_update()
+        super()._before_render()
+
+    def _before_resolve(self):
+        # an async render of the new states has to be awaited before rendering
         self._check_states_and_update()
-        return super()._render(sb, indent_level, indent_str, pretty, xhtml)
+        super()._before_resolve()
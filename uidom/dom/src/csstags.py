@@ -31,15 +31,19 @@ class Keyframes(extension.StyleTags):
         tagname = ""
         is_inline = True
 
-    def _render_attribute(self, /, sb, indent_level, indent_str, pretty, xhtml):
-        for key, value in self.attributes.items():
+    def set_attribute(self, key, value):
+        # keyframe selectors are wrapped once when they are set so that
+        # rendering never has to rewrite self.attributes
+        if isinstance(key, str) and key not in self.RENDER_CONTROLS:
             if not isinstance(value, (dict, self.EmptyStyleTag)):
                 raise TypeError(
                     f"{key}={value} is not dict or {self.EmptyStyleTag.__class__} type"
                 )
             if not isinstance(value, self.EmptyStyleTag):
-                self.attributes[key] = self.EmptyStyleTag(value)
-        return super()._render_attribute(sb, indent_level, indent_str, pretty, xhtml)
+                value = self.EmptyStyleTag(value)
+        super().set_attribute(key, value)
+
+    __setitem__ = set_attribute
 
     @staticmethod
     def _to_kebab_case(string):
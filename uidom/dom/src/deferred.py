@@ -0,0 +1,80 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import itertools
+
+from jinja2.utils import htmlsafe_json_dumps
+
+from uidom.dom.src.ext import PlaceholderTag, Tags
+from uidom.dom.src.utils.dom_util import escape_attribute
+
+__all__ = ["Deferred"]
+
+# ids of the deferred tags that weren't given one
+_ids = itertools.count(1)
+
+
+class Deferred(Tags):
+    """
+    A slow part of the page (ex. a widget backed by a remote service) that
+    doesn't hold up the rest of it. __async_render__ streams the page with the
+    fallback children in its place, and sends the html of the awaitable's result
+    at the end of the same response, in a <template> with a small script that
+    swaps it in as soon as it arrives.
+
+        @app.get("/", response_class=StreamingResponse)
+        async def dashboard():
+            with div(cls="dashboard") as page:
+                h1("Sales")
+                Deferred(load_chart(), p("loading..."), cls="chart")
+            return StreamingResponse(page)
+
+    The deferred tags of a page are awaited concurrently while the page is
+    streamed (in the task group of the response, see __async_render__), their
+    html is sent in the order they finish. A deferred tag whose awaitable raises
+    keeps its fallback, the error is logged and the rest of the page is sent.
+    Rendered any other way only the fallback is shown.
+    """
+
+    tagname = "div"
+    is_deferred = True
+    # defines the function the swap scripts call, sent once per response
+    swap_script = (
+        "<script>function uidomSwap(i){var t=document.getElementById(i+'-content'),"
+        "e=document.getElementById(i);e&&e.replaceWith(t.content);t.remove()}"
+        "</script>"
+    )
+
+    def __init__(self, awaitable, *args, **kwargs):
+        super(Deferred, self).__init__(*args, **kwargs)
+        self.awaitable = awaitable
+        # the resolved tags, see _resolve
+        self.content = None
+        if "id" not in self._attributes:
+            self["id"] = "deferred-%d" % next(_ids)
+
+    async def _resolve(self):
+        """
+        Awaits the awaitable and the ones its result brings, returns the Deferred
+        tags the result holds.
+        """
+        awaitable, self.awaitable = self.awaitable, None
+        content = PlaceholderTag()
+        result = await awaitable
+        if result is not None:
+            content.add(result)
+        deferred = await content.resolve_awaitables()
+        self.content = content
+        return deferred
+
+    def _swap_html(self, html):
+        id_ = str(self["id"])
+        return "".join(
+            [
+                '<template id="%s-content">' % escape_attribute(id_),
+                html,
+                "</template><script>uidomSwap(%s)</script>" % htmlsafe_json_dumps(id_),
+            ]
+        )
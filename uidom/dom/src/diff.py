@@ -0,0 +1,305 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Compares two trees of tags and returns the patches that turn the html of the old
+one into the html of the new one, so a re-render only ships what changed.
+
+Patches are applied in order. A path is the list of child node indexes from the
+root element to a node, counted on the minified html (pretty=False) where text
+nodes next to each other are one node, as in the browser. Tags that don't render
+themselves (components, placeholders) are left out, their children take their
+place. Text and html values are given as they are rendered, already escaped.
+
+    old = snapshot(counter)
+    counter.increment()
+    patches = diff(old, counter)
+    websocket.send_text(patches_to_json(patches))
+"""
+
+import json
+import typing
+
+from jinja2.utils import htmlsafe_json_dumps
+
+from uidom.dom.src.dom_tag import dom_tag
+from uidom.dom.src.ext import Tags
+from uidom.dom.src.utils.dom_util import dom_text
+
+__all__ = ["Patch", "diff", "snapshot", "patches_to_json", "patches_to_htmx"]
+
+
+TEXT = "text"  # the text node at path becomes value
+SET_ATTRIBUTE = "set"  # the attribute name of the element at path becomes value
+REMOVE_ATTRIBUTE = "remove"  # the attribute name of the element at path is dropped
+REPLACE = "replace"  # the node at path is replaced by the html value
+INSERT = "insert"  # the html value is inserted as child index of the element at path
+REMOVE_CHILD = "remove_child"  # child index of the element at path is dropped
+MOVE = "move"  # child index of the element at path moves to position value
+
+
+class Patch(typing.NamedTuple):
+    op: str
+    path: typing.Tuple[int, ...]
+    index: typing.Optional[int] = None
+    name: typing.Optional[str] = None
+    value: typing.Union[str, int, None] = None
+
+    def to_dict(self):
+        return {
+            key: value for key, value in self._asdict().items() if value is not None
+        }
+
+
+class _Node(object):
+    """
+    A node of the html as the browser sees it, elements keep their tag to render
+    them when they are inserted.
+    """
+
+    __slots__ = ("name", "attributes", "children", "html", "key", "tag")
+
+    def __init__(self, name, attributes=None, children=None, html=None, tag=None):
+        self.name = name
+        self.attributes = attributes
+        self.children = children
+        self.html = html
+        self.tag = tag
+        self.key = None
+        if attributes:
+            self.key = attributes.get("key", attributes.get("id"))
+
+    def render(self):
+        if self.html is None:
+            self.html = self.tag.__render__(pretty=False)
+        return self.html
+
+
+# names of the nodes that aren't elements
+_TEXT = "#text"
+_HTML = "#html"
+
+
+def _is_element(tag):
+    # tags with other delimiters or custom open/close tags (jinja, css) are kept
+    # as html, the diff doesn't look into them
+    return (
+        isinstance(tag, Tags)
+        and tag.left_delimiter == "<"
+        and not tag.open_tag
+        and not tag.close_tag
+    )
+
+
+def _attribute_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return str(htmlsafe_json_dumps(value))
+    return str(value)
+
+
+def snapshot(tag):
+    """
+    Copies what the tag renders, so the tag can change and be compared with the
+    snapshot afterwards.
+    """
+    if isinstance(tag, _Node):
+        return tag
+    nodes = _snapshot_children([tag])
+    if len(nodes) != 1 or nodes[0].name in (_TEXT, _HTML):
+        raise ValueError(f"{tag!r} does not render a single element")
+    return nodes[0]
+
+
+def _snapshot_children(children):
+    nodes = []
+    # the tree is walked with a stack of iterators, each with the list of nodes
+    # it fills
+    stack = [(iter(children), nodes)]
+    while stack:
+        items, siblings = stack[-1]
+        for child in items:
+            break
+        else:
+            stack.pop()
+            continue
+
+        text = child.text if isinstance(child, dom_text) else child
+        if isinstance(text, str) and "<" in text:
+            # raw html (ex. raw("<b>hi</b>")) is kept as it is
+            siblings.append(_Node(_HTML, html=text))
+        elif isinstance(text, str):
+            if siblings and siblings[-1].name == _TEXT:
+                # the browser joins text next to each other into one node
+                siblings[-1].html += text
+            elif text:
+                siblings.append(_Node(_TEXT, html=text))
+        elif not isinstance(child, dom_tag):
+            continue
+        elif _is_element(child) and not child.render_tag:
+            stack.append((iter(child._children), siblings))
+        elif _is_element(child):
+            attributes = {
+                name: _attribute_value(value)
+                for name, value in child._attributes.items()
+                if value is not False
+            }
+            node = _Node(child._tag_name, attributes, [], tag=child)
+            siblings.append(node)
+            if not child.is_single:
+                stack.append((iter(child._children), node.children))
+        else:
+            siblings.append(_Node(_HTML, html=child.__render__(pretty=False)))
+    return nodes
+
+
+def diff(old, new, keyed=True):
+    """
+    Returns the patches that turn the html of old into the html of new. Both can
+    be tags or snapshots. With keyed, children with a key or id attribute are
+    matched by it, so reordered or inserted rows are moved instead of rewritten.
+    """
+    old = snapshot(old)
+    new = snapshot(new)
+    patches = []
+    if old.name != new.name:
+        patches.append(Patch(REPLACE, (), value=new.render()))
+        return patches
+    stack = [(old, new, ())]
+    while stack:
+        old, new, path = stack.pop()
+        _diff_attributes(old, new, path, patches)
+        pairs = _diff_children(old.children, new.children, path, patches, keyed)
+        # elements are compared after the children of their parent are in place
+        # so the paths of the patches inside them are final
+        stack.extend(reversed(pairs))
+    return patches
+
+
+def _diff_attributes(old, new, path, patches):
+    before, after = old.attributes, new.attributes
+    if before == after:
+        return
+    for name, value in after.items():
+        if before.get(name) != value:
+            patches.append(Patch(SET_ATTRIBUTE, path, name=name, value=value))
+    for name in before:
+        if name not in after:
+            patches.append(Patch(REMOVE_ATTRIBUTE, path, name=name))
+
+
+def _diff_children(before, after, path, patches, keyed):
+    """
+    Adds the patches that turn the children before into after and returns the
+    pairs of matched elements to compare next, with their paths.
+    """
+    pairs = []
+    if keyed and any(node.key is not None for node in before + after):
+        matches = _match_keyed(before, after)
+    else:
+        matches = {
+            id(new): old for old, new in zip(before, after) if old.name == new.name
+        }
+    matched = {id(old) for old in matches.values()}
+
+    # the children that are gone are dropped first, last one first so the
+    # indexes of the others still hold
+    current = list(before)
+    for index in range(len(current) - 1, -1, -1):
+        if id(current[index]) not in matched:
+            patches.append(Patch(REMOVE_CHILD, path, index=index))
+            del current[index]
+
+    for index, new in enumerate(after):
+        old = matches.get(id(new))
+        if old is None:
+            patches.append(Patch(INSERT, path, index=index, value=new.render()))
+            current.insert(index, new)
+            continue
+        if current[index] is not old:
+            position = current.index(old, index)
+            patches.append(Patch(MOVE, path, index=position, value=index))
+            del current[position]
+            current.insert(index, old)
+        child_path = path + (index,)
+        if new.name in (_TEXT, _HTML):
+            if old.html != new.html:
+                op = TEXT if new.name == _TEXT else REPLACE
+                patches.append(Patch(op, child_path, value=new.html))
+        else:
+            pairs.append((old, new, child_path))
+    return pairs
+
+
+def _match_keyed(before, after):
+    """
+    Matches children by key, the ones without a key are matched in order with the
+    unkeyed ones of the same name.
+    """
+    keyed = {}
+    unkeyed = {}
+    for old in before:
+        if old.key is not None:
+            keyed.setdefault((old.name, old.key), old)
+        else:
+            unkeyed.setdefault(old.name, []).append(old)
+    matches = {}
+    for new in after:
+        if new.key is not None:
+            old = keyed.pop((new.name, new.key), None)
+        else:
+            candidates = unkeyed.get(new.name)
+            old = candidates.pop(0) if candidates else None
+        if old is not None:
+            matches[id(new)] = old
+    return matches
+
+
+def patches_to_json(patches):
+    """
+    Serializes the patches for the websocket path.
+    """
+    return json.dumps([patch.to_dict() for patch in patches])
+
+
+def patches_to_htmx(patches, new):
+    """
+    Returns the htmx out of band fragments for the patches, the outer html of the
+    closest element with an id around every change in the new tree, each swapped
+    by id with hx-swap-oob.
+    """
+    root = snapshot(new)
+    targets = {}
+    for patch in patches:
+        # the element the patch changes is at the path, or at its parent for
+        # text and html nodes and for replaced nodes
+        path = patch.path
+        if patch.op in (TEXT, REPLACE) and path:
+            path = path[:-1]
+        nodes = [root]
+        for index in path:
+            nodes.append(nodes[-1].children[index])
+        for depth in range(len(nodes) - 1, -1, -1):
+            if "id" in nodes[depth].attributes:
+                targets[path[:depth]] = nodes[depth]
+                break
+        else:
+            raise ValueError(
+                f"<{root.name}> needs an id to swap {patch.op} at {patch.path} out "
+                "of band"
+            )
+
+    fragments = []
+    for path in sorted(targets):
+        if any(path[:depth] in targets for depth in range(len(path))):
+            # swapped along with an element around it
+            continue
+        node = targets[path]
+        html = node.render()
+        fragments.append(
+            '<%s hx-swap-oob="true"%s' % (node.name, html[len(node.name) + 1 :])
+        )
+    return "".join(fragments)
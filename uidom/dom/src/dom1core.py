@@ -6,6 +6,8 @@ from __future__ import annotations
 
 from typing import MutableSequence, Union
 
+from uidom.dom.src.selector import select
+
 __license__ = """
 This file is part of Dominate.
 
@@ -51,7 +53,11 @@ class dom1core(object):
         """
         DOM API: Returns single element with matching id value.
         """
-        results = self.get(id=id)
+        index = self._indexed()
+        if index is not None:
+            results = self._under(index.with_id(id))
+        else:
+            results = self.get(id=id)
         if results is None:
             raise ValueError('No tags with id "%s".' % id)
         elif len(results) > 1:
@@ -70,6 +76,19 @@ class dom1core(object):
         else:
             return None
 
+    def querySelector(self, selectors):
+        """
+        DOM API: Returns the first element under the tag that matches the css
+        selectors, or None.
+        """
+        return next(select(self, selectors), None)
+
+    def querySelectorAll(self, selectors):
+        """
+        DOM API: Returns all elements under the tag that match the css selectors.
+        """
+        return list(select(self, selectors))
+
     def appendChild(self, obj):
         """
         DOM API: Add an item to the end of the children list.
@@ -95,19 +114,22 @@ class dom1core(object):
 
     @property
     def previousSibling(self) -> Union[dom1core, None]:
-        parentChildNodes = self.parentNode.childNodes
-        prev_sib_idx = parentChildNodes.index(self) - 1
-        try:
-            return parentChildNodes[prev_sib_idx]
-        except IndexError:
+        parent = self.parentNode
+        if parent is None:
             return None
+        prev_sib_idx = parent._child_index(self) - 1
+        if prev_sib_idx < 0:
+            return None
+        return parent._children[prev_sib_idx]
 
     @property
     def nextSibling(self) -> Union[dom1core, None]:
-        parentChildNodes = self.parentNode.childNodes
-        next_sib_idx = parentChildNodes.index(self) + 1
+        parent = self.parentNode
+        if parent is None:
+            return None
+        next_sib_idx = parent._child_index(self) + 1
         try:
-            return parentChildNodes[next_sib_idx]
+            return parent._children[next_sib_idx]
         except IndexError:
             return None
 
@@ -115,24 +137,50 @@ class dom1core(object):
     def ownerDocument(self):
         return self.document
 
-    # def insertBefore(self, newChild, refChild):
-    #     child_nodes = self.childNodes
-    #     insert_idx = child_nodes.index(refChild) - 1
-    #     child_nodes.insert(insert_idx, newChild)
-    #     return self
-
-    # def replaceChild(self, newChild, oldChild):
-    #     replace_idx = self.childNodes.index(oldChild)
-    #     self[replace_idx] = newChild
-    #     if isinstance(newChild, dom1core):
-    #         newChild.parent = self
-    #         newChild.setdocument(self.document)
-    #     self.removeChild(oldChild)
-    #     return self
-
-    # def removeChild(self, oldChild):
-    #     if isinstance(oldChild, dom1core):
-    #         oldChild.clear()
-    #         oldChild.parent = None
-    #     del oldChild
-    #     return self
+    def insertBefore(self, newChild, refChild):
+        """
+        DOM API: Inserts newChild before refChild, or at the end when refChild is
+        None. newChild is taken out of its current parent first.
+        """
+        self._detach(newChild)
+        if refChild is None:
+            return self.appendChild(newChild)
+        target = self._child_target()
+        target.insert(target._child_index(refChild), newChild)
+        return self
+
+    def replaceChild(self, newChild, oldChild):
+        """
+        DOM API: Puts newChild in place of oldChild.
+        """
+        self._detach(newChild)
+        target = self._child_target()
+        replace_idx = target._child_index(oldChild)
+        target.remove(oldChild)
+        target.insert(replace_idx, newChild)
+        return self
+
+    def removeChild(self, oldChild):
+        """
+        DOM API: Removes oldChild from the children.
+        """
+        self._child_target().remove(oldChild)
+        return self
+
+    def _child_target(self):
+        """
+        Returns the tag whose children the DOM API changes, the one add appends to.
+        """
+        return self
+
+    @staticmethod
+    def _detach(node):
+        parent = getattr(node, "parent", None)
+        if parent is None:
+            return
+        try:
+            parent._child_index(node)
+        except ValueError:
+            # added to another tag without being removed from this one
+            return
+        parent.remove(node)
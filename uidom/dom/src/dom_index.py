@@ -0,0 +1,77 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+__all__ = ["DocumentIndex"]
+
+
+class DocumentIndex(object):
+    """
+    Lookup tables of the tags under a document root, keyed by id, tag class and
+    attribute name. dom_tag.setdocument adds and drops the tags as they join and
+    leave the document and set_attribute/delete_attribute keep the attributes up
+    to date, so a lookup costs as much as the tags it returns.
+
+    Tags are listed in the order they joined the document. Attributes changed
+    through tag.attributes directly are not seen by the index.
+    """
+
+    __slots__ = ("ids", "types", "attributes")
+
+    def __init__(self):
+        # every table maps to {id(tag): tag}, tags aren't used as keys because
+        # components compare equal to the tag they render
+        self.ids = {}
+        self.types = {}
+        self.attributes = {}
+
+    def add(self, tag):
+        self.types.setdefault(type(tag), {})[id(tag)] = tag
+        for name, value in tag._attributes.items():
+            self.add_attribute(tag, name, value)
+
+    def discard(self, tag):
+        self._discard(self.types, type(tag), tag)
+        for name, value in tag._attributes.items():
+            self.discard_attribute(tag, name, value)
+
+    def add_attribute(self, tag, name, value):
+        self.attributes.setdefault(name, {})[id(tag)] = tag
+        if name == "id":
+            self.ids.setdefault(value, {})[id(tag)] = tag
+
+    def discard_attribute(self, tag, name, value):
+        self._discard(self.attributes, name, tag)
+        if name == "id":
+            self._discard(self.ids, value, tag)
+
+    @staticmethod
+    def _discard(table, key, tag):
+        tags = table.get(key)
+        if tags is not None:
+            tags.pop(id(tag), None)
+            if not tags:
+                del table[key]
+
+    def with_id(self, value):
+        return list(self.ids.get(value, {}).values())
+
+    def with_attribute(self, name, value=None):
+        """
+        Tags that have the attribute set, to value when it is given.
+        """
+        tags = self.attributes.get(name, {}).values()
+        if value is None:
+            return [tag for tag in tags if tag._attributes.get(name)]
+        return [tag for tag in tags if tag._attributes.get(name) == value]
+
+    def of_type(self, tag):
+        """
+        Tags that are instances of the class tag, or whose class is named tag.
+        """
+        results = []
+        for cls, tags in self.types.items():
+            if cls.__name__ == tag if isinstance(tag, str) else issubclass(cls, tag):
+                results.extend(tags.values())
+        return results
@@ -5,15 +5,18 @@
 
 
 import copy
+import inspect
+import math
 
 # pylint: disable=bad-indentation, bad-whitespace, missing-docstring
 import numbers
-import sys
-import threading
 import typing
-from collections import defaultdict, namedtuple
+from collections import namedtuple
+from contextvars import ContextVar
 from functools import wraps
 
+import anyio
+
 try:
     # Python 3
     from collections.abc import Callable
@@ -27,32 +30,151 @@ except NameError:  # py3
     basestring = str
     unicode = str
 
-try:
-    import greenlet  # type: ignore
-except ImportError:
-    greenlet = None
+from uidom.dom.src.dom_index import DocumentIndex
 
 __all__ = ["dom_string", "dom_tag", "get_current", "attr"]
 
 
-def _get_thread_context():
-    context = [threading.current_thread()]
-    if greenlet:
-        context.append(greenlet.getcurrent())
-    return hash(tuple(context))
+class _RenderCache(dict):
+    """
+    The rendered fragments of a tag by render key. They are used while version
+    is current, it is bumped when the escaping of the attributes of every tag
+    changes (see ext.SafeAttributes).
+    """
+
+    __slots__ = ("version",)
+    current = 0
+
+    def copy(self):
+        cache = _RenderCache(self)
+        cache.version = self.version
+        return cache
+
+
+# attribute values whose rendered text can be kept, the others (dict, list or
+# any object) can change in place without the tag knowing
+_scalar_values = frozenset([str, int, float, bool, type(None)])
+
+
+# the frames of the open with blocks, innermost last. Every thread, asyncio task
+# and greenlet runs in its own context so their stacks never mix. The stack is a
+# tuple that is replaced on enter and exit rather than changed in place, as a
+# task started inside a with block shares the value of its parent.
+_with_stack: ContextVar = ContextVar("uidom_with_stack", default=())
+
+
+# renders nested on the python stack: a tag that renders itself (ex. Cached,
+# FrozenTag) starts a render of its own tree inside the render of the page. More
+# than _render_depth_limit of them raise a RuntimeError before the interpreter
+# runs out of stack
+_render_depth: ContextVar = ContextVar("uidom_render_depth", default=0)
+_render_depth_limit = 100
+
+
+def _enter_render():
+    depth = _render_depth.get()
+    if depth >= _render_depth_limit:
+        raise RuntimeError(
+            "renders nested more than %d deep, tags that render themselves (ex."
+            " Cached, FrozenTag) are nested in each other too many times"
+            % _render_depth_limit
+        )
+    return _render_depth.set(depth + 1)
+
+
+# text children are kept as plain strings in the children list of their tag, they
+# don't keep a reference to it
+dom_string = basestring
+
+
+class _readonly_dict(dict):
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("%s is read-only" % type(self).__name__)
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # copied and pickled as the shared instance itself
+        return "_no_attributes"
 
 
-class dom_string(basestring):
-    pass
+# shared by every tag without attributes or children until something is added,
+# both are read-only so they can never be changed through a leaf by mistake
+_no_attributes = _readonly_dict()
+_no_children = ()
+
+
+# values a clone shares with the tag it was copied from
+_immutable = (basestring, numbers.Number, bool, type(None), bytes, frozenset, type)
+
+
+def _clone_value(value, memo):
+    """
+    Copies a field or attribute value for dom_tag.clone, tags already copied are
+    replaced by their copy and other tags are shared.
+    """
+    if isinstance(value, _immutable):
+        return value
+    if isinstance(value, dom_tag):
+        return memo.get(id(value), value)
+    if isinstance(value, tuple) and all(isinstance(v, _immutable) for v in value):
+        return value
+    return copy.deepcopy(value, memo)
+
+
+def _stamp_positions(children, start):
+    """
+    Stamps the index of each tag in children[start:] as its _position, see
+    dom_tag._child_index.
+    """
+    for position in range(start, len(children)):
+        node = children[position]
+        if isinstance(node, dom_tag):
+            node._position = position
 
 
 class dom_tag(object):
+    # the fields every tag has are slots, "__dict__" keeps subclasses free to add
+    # their own fields (and the rarely set per tag flags) without slots
+    __slots__ = (
+        "_attributes",
+        "_children",
+        "parent",
+        "_owner",
+        "_document",
+        "_ctx",
+        "_render_cache",
+        "_position",
+        "__dict__",
+        "__weakref__",
+    )
+
     is_single = False  # Tag does not require matching end tag (ex. <hr/>)
     is_pretty = True  # Text inside the tag should be left as-is (ex. <pre>)
     # otherwise, text will be escaped() and whitespace may be
     # modified
     is_inline = False
     escape_string = True
+    # rendered fragments of the tag are kept until the tag or any of its
+    # descendants change, set it to False for tags whose output can change
+    # without touching the tree (ex. lazy)
+    is_cacheable = True
+    # fragments longer than this are not kept, so deeply nested trees don't keep
+    # a copy of the whole subtree on every level (ancestors of such a tag don't
+    # keep a fragment either as it is never cached)
+    render_cache_limit = 64 * 1024
+    # the streamed render flushes everything rendered so far as soon as the tag
+    # is closed (ex. <head> so the browser can start fetching css and scripts)
+    stream_flush = False
+    # lookup tables of a document root, see index_document
+    _document_index: typing.Optional[DocumentIndex] = None
+    # pre-rendered nodes (see Tags.freeze) keep their tags apart from the tree
+    is_frozen = False
+    # children still waiting for an awaitable (see Await)
+    is_pending = False
+    # boundaries streamed at the end of the response (see Deferred)
+    is_deferred = False
 
     def __new__(_cls, *args, **kwargs):
         """
@@ -74,7 +196,12 @@ class dom_tag(object):
                     return wrapped(*args, **kwargs) or _tag
 
             return f
-        return object.__new__(_cls)
+        tag = object.__new__(_cls)
+        # subclasses can reach the attributes or children before __init__ (ex. the
+        # fields of dataclass components), which drops the render cache
+        tag.parent = None
+        tag._render_cache = None
+        return tag
 
     def __init__(self, *args, **kwargs):
         """
@@ -87,15 +214,26 @@ class dom_tag(object):
                        line.
         """
 
-        self.attributes = {}
-        self.children: typing.List[typing.Union[str, dom_tag]] = []
+        self._attributes = _no_attributes
+        self._children = _no_children
         self.parent = None
-        self.document = None
+        # the document set on the tag itself, tags without one belong to the
+        # document of their parent, see document
+        self._owner = None
+        self._document = None
+        self._ctx: typing.Optional[dom_tag.frame] = None
+        self._render_cache = None
+        # last known index of the tag in the children of its parent
+        self._position = None
 
         # Does not insert newlines on all children if True (recursive attribute)
-        self.is_inline = kwargs.pop("__inline", self.is_inline)
-        self.is_pretty = kwargs.pop("__pretty", self.is_pretty)
-        self.escape_string = kwargs.pop("__escape_string", self.escape_string)
+        # these are only kept on the tag when they differ from the class
+        if "__inline" in kwargs:
+            self.is_inline = kwargs.pop("__inline")
+        if "__pretty" in kwargs:
+            self.is_pretty = kwargs.pop("__pretty")
+        if "__escape_string" in kwargs:
+            self.escape_string = kwargs.pop("__escape_string")
 
         # Add child elements
         if args:
@@ -105,58 +243,63 @@ class dom_tag(object):
             self.set_attribute(*type(self).clean_pair(attr, value))
 
         # this is where the this class instance is added to the parent context via _add_to_context
-        self._ctx: typing.Optional[dom_tag.frame] = None
         self._add_to_ctx()
 
+    # the attributes and children can be changed in place through these, the
+    # rendered fragments are dropped whenever they are handed out
+    @property
+    def attributes(self) -> typing.Dict[str, typing.Any]:
+        if self._attributes is _no_attributes:
+            self._attributes = {}
+        self._invalidate_render()
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self._attributes = attributes
+        self._invalidate_render()
+
+    @property
+    def children(self) -> typing.List[typing.Union[str, "dom_tag"]]:
+        if self._children is _no_children:
+            self._children = []
+        self._invalidate_render()
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self._invalidate_render()
+
     # context manager
     frame = namedtuple("frame", ["tag", "items", "used"])
-    # stack of frames
-    _with_contexts: typing.DefaultDict = defaultdict(list)
-
     def _add_to_ctx(self):
         # here we are assuming that when the self is initialized it is
         # under only single level of context and that the thread_context to which its
         # child is added is same as that of self. But its not true in case we define
         # render() methods in dom_tag subclasses in with multiple levels of context
         # are present where a child can be added to subcontext
-        stack = dom_tag._with_contexts.get(_get_thread_context())
+        stack = _with_stack.get()
         if stack:
             self._ctx = stack[-1]
             stack[-1].items.append(self)
 
     def __enter__(self):
-        # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        # recursion limit taken from https://stackoverflow.com/a/50120316
-        # there is a need to increase recursion limit due to fastapi hitting
-        # maximum recursion limit, god knows for what reasons. lets see if
-        # it works, if it doesn't will roll it back in next release
-        self._orig_recurse_limit = sys.getrecursionlimit()
-        if self._orig_recurse_limit < 1500:
-            sys.setrecursionlimit(1500)
-        # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-
-        stack = dom_tag._with_contexts[_get_thread_context()]
-        stack.append(dom_tag.frame(self, [], set()))
+        _with_stack.set(_with_stack.get() + (dom_tag.frame(self, [], set()),))
         return self
 
     def __exit__(self, type, value, traceback):
-        thread_id = _get_thread_context()
-        stack = dom_tag._with_contexts[thread_id]
-        frame = stack.pop()
+        stack = _with_stack.get()
+        frame = stack[-1]
+        _with_stack.set(stack[:-1])
 
         for item in frame.items:
+            # the frame is only needed while the block runs (see __call__), so
+            # tags don't keep the items and used tags of the block alive
+            item._ctx = None
             if item in frame.used:
                 continue
             self.add(item)
-        if not stack:
-            del dom_tag._with_contexts[thread_id]
-
-        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        # reset orig recursion limit to whatever it was, lets hope it works
-        current_recurse_limit = sys.getrecursionlimit()
-        if current_recurse_limit > self._orig_recurse_limit:
-            sys.setrecursionlimit(self._orig_recurse_limit)
-        # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
     def __call__(self, func):
         """
@@ -170,52 +313,269 @@ class dom_tag(object):
 
         @wraps(func)
         def f(*args, **kwargs):
-            tag = copy.deepcopy(self)
+            tag = self.clone()
             tag._add_to_ctx()
             with tag:
                 return func(*args, **kwargs) or tag
 
         return f
 
+    def clone(self):
+        """
+        Returns a copy of the tag and of the tags under it, without a parent. Text
+        and immutable attribute values are shared with self rather than copied and
+        the tags under the clone keep their rendered fragments, so a clone that is
+        not changed renders as fast as self.
+        """
+        # the tags are copied first and their fields afterwards, so the fields
+        # that refer to tags of the subtree (ex. the entry of a component) can be
+        # pointed at the copies, memo maps id(tag) to its copy as deepcopy does
+        memo = {}
+        root = self._clone_node(None, memo)
+        pairs = [(self, root)]
+        stack = [(self, root)]
+        while stack:
+            source, node = stack.pop()
+            if source._children is _no_children:
+                continue
+            children = []
+            for child in source._children:
+                if isinstance(child, dom_tag):
+                    copied = child._clone_node(node, memo)
+                    pairs.append((child, copied))
+                    stack.append((child, copied))
+                    child = copied
+                children.append(child)
+            node._children = children
+
+        indexed = []
+        for source, node in pairs:
+            if source._attributes is not _no_attributes:
+                node._attributes = {
+                    name: _clone_value(value, memo)
+                    for name, value in source._attributes.items()
+                }
+            if source._owner is not None:
+                # a document outside the subtree doesn't hold the clone
+                node._owner = memo.get(id(source._owner))
+            fields = source.__dict__
+            if fields:
+                node.__dict__.update(
+                    (name, _clone_value(value, memo)) for name, value in fields.items()
+                )
+                if node.__dict__.pop("_document_index", None) is not None:
+                    indexed.append(node)
+        root._render_cache = None
+        for node in indexed:
+            node.index_document()
+        return root
+
+    def _clone_node(self, parent, memo):
+        """
+        Returns a copy of the tag alone, see clone.
+        """
+        node = object.__new__(type(self))
+        memo[id(self)] = node
+        node._attributes = _no_attributes
+        node._children = _no_children
+        node.parent = parent
+        node._owner = None
+        node._document = None
+        node._ctx = None
+        cache = self._render_cache
+        node._render_cache = None if cache is None else cache.copy()
+        node._position = self._position
+        return node
+
     def set_attribute(self, key, value):
         """
         Add or update the value of an attribute.
         """
         if isinstance(key, int):
-            self.children[key] = value
+            # replaced like remove and insert do, so the parent, the document and
+            # the rendered fragments follow
+            index = range(len(self._children))[key]
+            self._remove_at(index)
+            self.insert(index, value)
         elif isinstance(key, basestring):
+            index = self._indexed()
+            if index is not None and self.document is not self:
+                if key in self._attributes:
+                    index.discard_attribute(self, key, self._attributes[key])
+                index.add_attribute(self, key, value)
             self.attributes[key] = value
         else:
             raise TypeError(
                 "Only integer and string types are valid for assigning "
                 "child tags and attributes, respectively."
             )
+        self._invalidate_render()
 
     __setitem__ = set_attribute
 
     def delete_attribute(self, key):
         if isinstance(key, int):
-            del self.children[key : key + 1]
+            # like deleting a slice, an index out of range deletes nothing
+            if -len(self._children) <= key < len(self._children):
+                self._remove_at(key % len(self._children))
         else:
+            index = self._indexed()
+            if index is not None and self.document is not self:
+                if key in self._attributes:
+                    index.discard_attribute(self, key, self._attributes[key])
             del self.attributes[key]
+        self._invalidate_render()
 
     __delitem__ = delete_attribute
 
+    @property
+    def document(self):
+        """
+        The document the tag belongs to, the one set on the tag or on its closest
+        ancestor that has one.
+        """
+        if self._owner is not None or self.parent is None:
+            return self._owner
+        known = self._document
+        if known is not None:
+            return known[0]
+        # the parents are walked up to the first one that knows its document and
+        # the answer is kept as (document,) on every tag on the way, including the
+        # one it was found on. They are dropped when a tag on the way moves to
+        # another document, see _forget_document
+        path = []
+        node = self
+        while True:
+            path.append(node)
+            if node._owner is not None or node.parent is None:
+                doc = node._owner
+                break
+            known = node._document
+            if known is not None:
+                doc = known[0]
+                break
+            node = node.parent
+        known = (doc,)
+        for node in path:
+            node._document = known
+        return doc
+
+    @document.setter
+    def document(self, doc):
+        self.setdocument(doc)
+
     def setdocument(self, doc):
         """
         Creates a reference to the parent document to allow for partial-tree
-        validation.
-        """
-        # assume that a document is correct in the subtree
-        if self.document != doc:
-            self.document = doc
-            # we changed "for child in self.children" to "for child in self"
-            # because we want to implement custom __iter__ method that returns
-            # children that can refere any entry point in dom_tag subclasses
-            for child in self:
-                if not isinstance(child, dom_tag):
-                    continue
-                child.setdocument(doc)
+        validation. The tags under self belong to doc as well, unless they have
+        a document set on themselves. Passing None makes the tag belong to the
+        document of its parent again.
+        """
+        old = self.document
+        # the kept document of self may come from the owner it had
+        known, self._document = self._document, None
+        self._owner = doc
+        new = self.document
+        self._document = known
+        if old is not new:
+            self._forget_document()
+            self._moved_document(old, new)
+
+    def _forget_document(self):
+        """
+        Drops the document kept by self and the tags under it that found theirs
+        through self, after self moved to another document. The tags of other
+        subtrees keep theirs.
+        """
+        if self._document is None:
+            # no tag under self found its document through self
+            return
+        self._document = None
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for child in node._children:
+                # the tags under a document of their own keep it
+                if (
+                    isinstance(child, dom_tag)
+                    and child._document is not None
+                    and child._owner is None
+                ):
+                    child._document = None
+                    stack.append(child)
+
+    def _moved_document(self, old, new):
+        """
+        Updates the indexes of the documents after self and the tags under it
+        moved from the document old to new.
+        """
+        old_index = None if old is None else old._document_index
+        new_index = None if new is None else new._document_index
+        if old is new or (old_index is None and new_index is None):
+            # nothing to walk, the tags find their document through the parents
+            return
+        # the subtree is walked with an explicit stack so that deep trees never
+        # hit the recursion limit. Children are walked through __iter__ like get
+        # does, so the index holds the tags get would find, they are pushed
+        # reversed to visit them in document order.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is not self and node._owner is not None:
+                # the tags under it belong to the document set on it
+                continue
+            if old_index is not None and node is not old:
+                old_index.discard(node)
+            if new_index is not None and node is not new:
+                new_index.add(node)
+            children = [child for child in node if isinstance(child, dom_tag)]
+            stack.extend(reversed(children))
+
+    def _leave_parent(self):
+        """
+        Detaches the tag from its parent, it keeps no document of its own.
+        """
+        old = self.document
+        self.parent = None
+        self._owner = None
+        if old is not None:
+            self._forget_document()
+            self._moved_document(old, None)
+
+    def index_document(self):
+        """
+        Makes the tag the document of its subtree and keeps an index of the tags
+        in it, which getElementById and the presence checks look up instead of
+        walking the tree.
+        """
+        if self._document_index is None:
+            self.setdocument(self)
+            self._document_index = DocumentIndex()
+            self._moved_document(None, self)
+        return self._document_index
+
+    def _indexed(self):
+        """
+        The index of the document of the tag, None if the document keeps none.
+        """
+        doc = self.document
+        return None if doc is None else doc._document_index
+
+    def _under(self, tags):
+        """
+        Keeps the tags from an index lookup that are descendants of self.
+        """
+        if self.document is self:
+            # the document root is not part of its own index
+            return tags
+        results = []
+        for tag in tags:
+            node = tag.parent
+            while node is not None and node is not self:
+                node = node.parent
+            if node is self:
+                results.append(tag)
+        return results
 
     def add(self, *args):
         """
@@ -227,6 +587,10 @@ class dom_tag(object):
                 obj = str(obj)
 
             if isinstance(obj, basestring):
+                if type(obj) is not str:
+                    # kept as plain text, subclasses (ex. the stand-ins of
+                    # compiled components) are not looked at while escaping
+                    obj = str(obj)
                 # we are going to add the support for escaping only those strings whoes parents
                 # have explicit variable "escape_string" set to True
                 if hasattr(self, "escape_string"):
@@ -235,28 +599,41 @@ class dom_tag(object):
                 else:
                     obj = escape(obj)
 
-                # we are wrapping str into dom_string because when we use .get method we may
-                # for some reason want to get the parent of the string values in children,
-                # natively its not possible so we wrap str in dom_string and set self as parent
-
-                obj = dom_string(obj) if not isinstance(obj, dom_string) else obj
-                obj.parent = self
-
                 self.children.append(obj)
 
             elif isinstance(obj, dom_tag):
-                stack = dom_tag._with_contexts.get(_get_thread_context(), [])
-                for s in stack:
+                for s in _with_stack.get():
                     s.used.add(obj)
 
-                self.children.append(obj)
+                if obj.parent is not None and obj.parent is not self:
+                    # the old parent may still hold the rendered fragment of obj
+                    obj.parent._invalidate_render()
+
+                old = obj.document
+                children = self.children
+                obj._position = len(children)
+                children.append(obj)
                 obj.parent = self
-                obj.setdocument(self.document)
+                obj._owner = None
+                new = self.document
+                if old is not new:
+                    # attaching is O(1), the tags under obj find their document
+                    # through the parents unless a document keeps an index
+                    obj._forget_document()
+                    obj._moved_document(old, new)
+                elif obj._document is not None and self._document is None:
+                    # the tags under obj keep theirs, self is on their way now
+                    self._document = (new,)
 
             elif isinstance(obj, dict):
                 for attr, value in obj.items():
                     self.set_attribute(*self.clean_pair(attr, value))
 
+            elif inspect.isawaitable(obj):
+                from uidom.dom.src.awaitable import Await
+
+                self.add(Await(obj))
+
             elif hasattr(obj, "__iter__"):
                 for subobj in obj:
                     self.add(subobj)
@@ -264,6 +641,8 @@ class dom_tag(object):
             else:  # wtf is it?
                 raise ValueError(self.__class__, "%r not a tag or string." % obj)
 
+        self._invalidate_render()
+
         if len(args) == 1:
             return args[0]
 
@@ -271,34 +650,159 @@ class dom_tag(object):
 
     def add_raw_string(self, s):
         self.children.append(s)
+        self._invalidate_render()
+
+    def insert(self, position, obj):
+        """
+        Adds obj like add does, as the child at position instead of the last one.
+        """
+        children = self.children
+        count = len(children)
+        self.add(obj)
+        if position < count:
+            added = children[count:]
+            del children[count:]
+            children[position:position] = added
+            _stamp_positions(children, position)
+        return obj
 
     def remove(self, obj):
-        self.children.remove(obj)
+        if isinstance(obj, dom_tag):
+            # tags are found by identity, components compare equal to their entry
+            self._remove_at(self._child_index(obj))
+        else:
+            self._remove_at(self.children.index(obj))
+
+    def _remove_at(self, index):
+        """
+        Removes the child at index, a tag leaves its parent and document.
+        """
+        children = self.children
+        obj = children[index]
+        del children[index]
+        if isinstance(obj, dom_tag) and obj.parent is self:
+            obj._leave_parent()
+        _stamp_positions(children, index)
+        self._invalidate_render()
+
+    def _child_index(self, child):
+        """
+        Returns the index of the tag child in the children of self.
+        """
+        children = self._children
+        position = child._position
+        if (
+            position is not None
+            and position < len(children)
+            and children[position] is child
+        ):
+            return position
+        # the children were changed directly since the positions were last
+        # stamped, one pass stamps all of them again so the next lookups are O(1)
+        _stamp_positions(children, 0)
+        position = child._position
+        if (
+            position is None
+            or position >= len(children)
+            or children[position] is not child
+        ):
+            raise ValueError("%r is not a child of %r" % (child, self))
+        return position
 
     def clear(self):
-        for i in self.children:
+        for i in self._children:
             if isinstance(i, dom_tag) and i.parent is self:
-                i.parent = None
-        self.children = []
+                i._leave_parent()
+        self._children = _no_children
+        self._invalidate_render()
 
-    def get(self, tag=None, **kwargs):
+    def _invalidate_render(self):
+        """
+        Drops the rendered fragments of the tag and of all its ancestors.
+        """
+        # a parent only keeps a fragment when all of its children kept one, so
+        # we can stop at the first ancestor that has nothing cached
+        node = self
+        while node is not None and node._render_cache is not None:
+            node._render_cache = None
+            node = node.parent
+
+    def _render_cache_key(self, indent_level, indent_str, pretty, xhtml):
+        if pretty:
+            return (indent_level, indent_str, xhtml)
+        # without pretty no whitespace is emitted, so indentation doesn't matter
+        return (xhtml,)
+
+    def _render_is_cached(self):
+        """
+        True if the last render of the tag was kept in the render cache.
+        """
+        cache = self._render_cache
+        return cache is not None and cache.version == _RenderCache.current
+
+    def _cache_render(self, key, sb, start):
+        """
+        Keeps sb[start:] as the rendered fragment of the tag, only if every
+        child tag could keep its own fragment too.
+        """
+        if not self.is_cacheable or not self._attributes_are_scalar():
+            return
+        # when the fragment isn't kept the ones kept by other renders (ex.
+        # minified) are dropped too, so the ancestors don't join theirs only to
+        # find out it's too long. The fragments of the ancestors hold them, so
+        # they are dropped as well (see _invalidate_render)
+        for child in self._children:
+            if isinstance(child, dom_tag) and not child._render_is_cached():
+                self._invalidate_render()
+                return
+        fragment = "".join(sb[start:])
+        if len(fragment) > self.render_cache_limit:
+            self._invalidate_render()
+            return
+        cache = self._render_cache
+        if cache is None or cache.version != _RenderCache.current:
+            cache = self._render_cache = _RenderCache()
+            cache.version = _RenderCache.current
+        cache[key] = fragment
+
+    def _attributes_are_scalar(self):
+        """
+        True if the rendered attributes only change through set_attribute, no
+        value can be changed in place.
+        """
+        for value in self._attributes.values():
+            if type(value) not in _scalar_values:
+                return False
+        return True
+
+    def get(self, tag=None, frozen=False, **kwargs):
         """
         Recursively searches children for tags of a certain
-        type with matching attributes.
+        type with matching attributes. The tags of frozen nodes are
+        searched as well when frozen is True.
+        """
+        return list(self.iter_find(tag, frozen, **kwargs))
+
+    def find_first(self, tag=None, frozen=False, **kwargs):
+        """
+        Returns the first match of get, or None, without searching the rest of
+        the tree.
+        """
+        return next(self.iter_find(tag, frozen, **kwargs), None)
+
+    def iter_find(self, tag=None, frozen=False, **kwargs):
+        """
+        Yields the matches of get in document order as the tree is searched.
         """
         # Stupid workaround since we can not use dom_tag in the method declaration
         if tag is None:
             tag = dom_tag
 
-        attrs = [(self.clean_attribute(attr), value) for attr, value in kwargs.items()]
-
-        results = []
-        # the reason for changing from "for child in self.children" to "for child in self" below
-        # is that self already has __iter__ method and it iter over self.children, also when we
-        # subclass dom_tag its subclasses can implement different __iter__ method so we don't have
-        # to care for each implementations.
+        attrs = [
+            (self._clean_attribute_name(attr), value) for attr, value in kwargs.items()
+        ]
 
-        for child in self:
+        for _, child in self._walk(frozen):
             if isinstance(tag, (basestring, type)):
                 # tags here can be of any type (including basestring type), while
                 # child can be only string or dom_tag.
@@ -307,9 +811,9 @@ class dom_tag(object):
                     not isinstance(tag, basestring) and isinstance(child, tag)
                 ):
                     if all(
-                        child.attributes.get(attribute) == value
+                        child._attributes.get(attribute) == value
                         if value is not None
-                        else child.attributes.get(attribute)
+                        else child._attributes.get(attribute)
                         # this is to handle cases where we want to check mere
                         # presence of attributes like x-data or x-component so
                         # we use element.get(x_data=None) as a work around as
@@ -317,16 +821,62 @@ class dom_tag(object):
                         for attribute, value in attrs
                     ):
                         # If the child is of correct type and has all attributes and values
-                        # in kwargs add as a result
-                        results.append(child)
+                        # in kwargs yield it as a result
+                        yield child
             elif isinstance(tag, dom_tag):
                 if child is tag:
-                    results.append(child)
+                    yield child
+
+    def parent_of(self, node):
+        """
+        Returns the tag under self whose children hold the tag node, or None.
+        Text children are plain strings, equal ones can be the same object in
+        many places of the tree, so they can't be looked up (see text_nodes).
+        """
+        if isinstance(node, basestring):
+            raise TypeError(
+                "the tag holding a string can't be told apart, use text_nodes"
+            )
+        for parent, child in self._walk():
+            if child is node:
+                return parent
+        return None
+
+    def text_nodes(self):
+        """
+        Yields (parent, text) for every text child under self in document order,
+        parent being the tag whose children hold the text.
+        """
+        for parent, child in self._walk():
+            if isinstance(child, basestring):
+                yield parent, child
+
+    def _walk(self, frozen=False):
+        """
+        Yields (parent, child) for every node under self in document order, and
+        under the frozen nodes when frozen is True.
+        """
+        # the reason for iterating "for child in tag" rather than over tag.children
+        # is that subclasses of dom_tag can implement a different __iter__ method so
+        # we don't have to care for each implementations.
+
+        # the tree is walked depth first with a stack of iterators instead of recursing
+        # into every child
+        stack = [(self, iter(self))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                break
+            else:
+                stack.pop()
+                continue
 
+            yield parent, child
             if isinstance(child, dom_tag):
-                # If the child is a dom_tag extend the search down through its children
-                results.extend(child.get(tag, **kwargs))
-        return results
+                if frozen and child.is_frozen:
+                    stack.append((child, iter((child.tree,))))
+                else:
+                    stack.append((child, iter(child)))
 
     def __getitem__(self, key):
         """
@@ -336,13 +886,13 @@ class dom_tag(object):
         if isinstance(key, int):
             # Children are accessed using integers
             try:
-                return object.__getattribute__(self, "children")[key]
+                return object.__getattribute__(self, "_children")[key]
             except KeyError:
                 raise IndexError('Child with index "%s" does not exist.' % key)
         elif isinstance(key, basestring):
             # Attributes are accessed using strings
             try:
-                return object.__getattribute__(self, "attributes")[key]
+                return object.__getattribute__(self, "_attributes")[key]
             except KeyError:
                 raise AttributeError('Attribute "%s" does not exist.' % key)
         else:
@@ -357,7 +907,7 @@ class dom_tag(object):
         """
         Number of child elements.
         """
-        return len(self.children)
+        return len(self._children)
 
     def __bool__(self):
         """
@@ -371,14 +921,17 @@ class dom_tag(object):
         """
         Iterates over child elements.
         """
-        return self.children.__iter__()
+        return self._children.__iter__()
 
     def __contains__(self, item):
         """
         Checks recursively if item is in children tree.
         Accepts both a string and a class.
         """
-        return bool(self.get(item))
+        index = self._indexed()
+        if index is not None and isinstance(item, (basestring, type)):
+            return bool(self._under(index.of_type(item)))
+        return self.find_first(item) is not None
 
     def __iadd__(self, obj):
         """
@@ -397,14 +950,207 @@ class dom_tag(object):
         html_tokens = self._render([], 0, indent, pretty, xhtml)
         return "".join(html_tokens)
 
-    async def __async_render__(self, indent="  ", pretty=True, xhtml=False):
-        for html_token in self._render([], 0, indent, pretty, xhtml):
-            yield html_token
+    async def __async_render__(
+        self,
+        indent="  ",
+        pretty=True,
+        xhtml=False,
+        chunk_size=16 * 1024,
+        task_group=None,
+    ):
+        """
+        Yields the html in chunks of about chunk_size characters as the tree is
+        rendered, tags with stream_flush set are sent as soon as they are closed.
+
+        The awaitable children (see Await) are awaited concurrently, the html is
+        sent up to the first one still pending. The html of the Deferred tags is
+        sent last, as they resolve. The awaitables run in task_group (ex. the
+        one StreamingResponse keeps for the response), without one everything is
+        awaited before the first chunk.
+        """
+        pending, deferred = self._pending_nodes()
+        if not pending and not deferred:
+            for chunk in self._render_chunks(indent, pretty, xhtml, chunk_size):
+                yield chunk
+            return
+
+        from uidom.dom.src.awaitable import stream_pending
+
+        send, receive = anyio.create_memory_object_stream(math.inf)
+        render = (self, send, pending, deferred, indent, pretty, xhtml, chunk_size)
+        if task_group is None:
+            await stream_pending(*render)
+        else:
+            task_group.start_soon(stream_pending, *render)
+        async with receive:
+            async for chunk in receive:
+                yield chunk
+
+    async def resolve_awaitables(self):
+        """
+        Awaits all the awaitable children (see Await) under the tag concurrently,
+        again for the ones the results bring until none is left. Returns the
+        Deferred tags under the tag, they are left to __async_render__.
+        """
+        while True:
+            pending, deferred = self._pending_nodes()
+            if not pending:
+                return deferred
+            async with anyio.create_task_group() as tasks:
+                for node in pending:
+                    tasks.start_soon(node._resolve)
+
+    def _pending_nodes(self):
+        """
+        Returns the tags under self (self included) still waiting for an awaitable
+        and the Deferred tags, in a single walk of the tree.
+        """
+        pending = []
+        deferred = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._before_resolve()
+            if node.is_pending:
+                pending.append(node)
+            elif node.is_deferred:
+                deferred.append(node)
+            for child in node._children:
+                if isinstance(child, dom_tag):
+                    stack.append(child)
+        # in document order, the stack walks the children backwards
+        pending.reverse()
+        deferred.reverse()
+        return pending, deferred
+
+    def _before_resolve(self):
+        """
+        Called on every tag before its awaitable children are looked for, the
+        tags that render differently on every render update themselves here.
+        """
+
+    def render_into(
+        self, buffer, indent="  ", pretty=True, xhtml=False, encoding="utf-8"
+    ):
+        """
+        Writes the encoded html into a bytearray or any object with a write()
+        method (file, socket wrapper, io.BytesIO) chunk by chunk, without ever
+        building the whole page as a single string.
+
+        The render is synchronous, a tree holding an awaitable child (see Await)
+        raises RuntimeError unless resolve_awaitables() was awaited first, such
+        pages are sent with StreamingResponse.
+        """
+        write = buffer.extend if isinstance(buffer, bytearray) else buffer.write
+        for chunk in self._render_chunks(indent, pretty, xhtml):
+            write(chunk.encode(encoding))
+        return buffer
+
+    def _render_chunks(
+        self, indent="  ", pretty=True, xhtml=False, chunk_size=16 * 1024, wait=False
+    ):
+        """
+        Yields the html in chunks, with wait=True the tags still waiting for an
+        awaitable are yielded as well, the render goes on with them once the
+        caller has awaited them.
+        """
+        sb = []
+        # sb is never cleared as the render cache keeps slices of it, we only
+        # remember what was already sent
+        flushed = counted = size = 0
+        for tag in self._iter_render(sb, 0, indent, pretty, xhtml, stream=True):
+            size += sum(map(len, sb[counted:]))
+            counted = len(sb)
+            if tag.is_pending:
+                if not wait:
+                    # raises the error of the tag
+                    tag._before_render()
+                if flushed < counted:
+                    yield "".join(sb[flushed:counted])
+                    flushed = counted
+                    size = 0
+                yield tag
+            elif size >= chunk_size or tag.stream_flush:
+                yield "".join(sb[flushed:counted])
+                flushed = counted
+                size = 0
+        if flushed < len(sb):
+            yield "".join(sb[flushed:])
+
+    def _iter_render(self, sb, indent_level, indent_str, pretty, xhtml, stream=False):
+        """
+        Renders the tag into sb, with stream=True every tag closed along the way
+        is yielded so that the caller can flush what was rendered so far, as is
+        every tag still waiting for an awaitable before it is rendered.
+        """
+        if stream and self.is_pending:
+            yield self
+        self._render(sb, indent_level, indent_str, pretty, xhtml)
+        if stream:
+            yield self
+
+    def _before_render(self):
+        """
+        Called right before the tag is rendered, subclasses can override it to
+        update their children instead of overriding '_render'.
+        """
 
     def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        token = _enter_render()
+        try:
+            # children that render like dom_tag are walked with a stack of frames
+            # (see _render_open) instead of recursing, the others (ex. Tags) render
+            # themselves
+            frame = self._render_open(sb, indent_level, indent_str, pretty, xhtml)
+            stack = [] if frame is None else [frame]
+            while stack:
+                frame = stack[-1]
+                level, pretty = frame[2], frame[3]
+                for child in frame[1]:
+                    if isinstance(child, dom_tag):
+                        if pretty and not child.is_inline:
+                            frame[4] = False
+                            sb.append("\n")
+                            sb.append(indent_str * level)
+                        if type(child)._render is not dom_tag._render:
+                            child._render(sb, level, indent_str, pretty, xhtml)
+                            continue
+                        frame = child._render_open(sb, level, indent_str, pretty, xhtml)
+                        if frame is not None:
+                            stack.append(frame)
+                            break
+                    else:
+                        sb.append(unicode(child))
+                else:
+                    stack.pop()
+                    frame[0]._render_close(sb, frame, indent_str)
+        finally:
+            _render_depth.reset(token)
+        return sb
+
+    def _render_open(self, sb, indent_level, indent_str, pretty, xhtml):
+        """
+        Renders the open tag, returns the frame the children are rendered with,
+        [tag, children, indent_level, pretty, inline, key, start, name], or None
+        when the tag is done (cached or single).
+        """
+        self._before_render()
         pretty = pretty and self.is_pretty
 
-        name = getattr(self, "tagname", type(self).__name__)
+        key = self._render_cache_key(indent_level, indent_str, pretty, xhtml)
+        cache = self._render_cache
+        if (
+            cache is not None
+            and cache.version == _RenderCache.current
+            and key in cache
+        ):
+            sb.append(cache[key])
+            return None
+        start = len(sb)
+
+        name = getattr(self, "tagname", None)
+        if name is None:
+            name = type(self).__name__
 
         # Workaround for python keywords and standard classes/methods
         # (del, object, input)
@@ -417,51 +1163,38 @@ class dom_tag(object):
         sb.append("<")
         sb.append(name)
 
-        for attribute, value in sorted(self.attributes.items()):
+        for attribute, value in sorted(self._attributes.items()):
             if value is not False:  # False values must be omitted completely
-                sb.append(' %s="%s"' % (attribute, escape(unicode(value), True)))
+                sb.append(' %s="%s"' % (attribute, escape_attribute(unicode(value))))
 
         sb.append(" />" if self.is_single and xhtml else ">")
 
-        if not self.is_single:
-            inline = self._render_children(
-                sb, indent_level + 1, indent_str, pretty, xhtml
-            )
-
-            if pretty and not inline:
-                sb.append("\n")
-                sb.append(indent_str * indent_level)
-
-            # close tag
-            sb.append("</")
-            sb.append(name)
-            sb.append(">")
-
-        return sb
+        if self.is_single:
+            self._cache_render(key, sb, start)
+            return None
+        return [self, iter(self), indent_level + 1, pretty, True, key, start, name]
 
-    def _render_children(self, sb, indent_level, indent_str, pretty, xhtml):
-        inline = True
-        for child in self:
-            if isinstance(child, dom_tag):
-                if pretty and not child.is_inline:
-                    inline = False
-                    sb.append("\n")
-                    sb.append(indent_str * indent_level)
-                child._render(sb, indent_level, indent_str, pretty, xhtml)
-            else:
-                sb.append(unicode(child))
+    def _render_close(self, sb, frame, indent_str):
+        _, _, level, pretty, inline, key, start, name = frame
+        if pretty and not inline:
+            sb.append("\n")
+            sb.append(indent_str * (level - 1))
 
-        return inline
+        # close tag
+        sb.append("</")
+        sb.append(name)
+        sb.append(">")
+        self._cache_render(key, sb, start)
 
     def __repr__(self):
         name = "%s.%s" % (self.__module__, type(self).__name__)
 
-        attributes_len = len(self.attributes)
+        attributes_len = len(self._attributes)
         attributes = "%s attribute" % attributes_len
         if attributes_len != 1:
             attributes += "s"
 
-        children_len = len(self.children)
+        children_len = len(self._children)
         children = "%s child" % children_len
         if children_len != 1:
             children += "ren"
@@ -502,6 +1235,10 @@ class dom_tag(object):
 
         return attribute
 
+    @classmethod
+    def _clean_attribute_name(cls, attribute):
+        return cls.clean_attribute(attribute)
+
     @classmethod
     def clean_pair(cls, attribute, value):
         """
@@ -510,7 +1247,7 @@ class dom_tag(object):
 
         Ex. input(selected=True) is equivalent to input(selected="selected")
         """
-        attribute = cls.clean_attribute(attribute)
+        attribute = cls._clean_attribute_name(attribute)
 
         # Check for boolean attributes
         # (i.e. selected=True becomes selected="selected")
@@ -530,8 +1267,7 @@ def get_current(default=_get_current_none):
     get the current tag being used as a with context or decorated function.
     if no context is active, raises ValueError, or returns the default, if provided
     """
-    h = _get_thread_context()
-    ctx = dom_tag._with_contexts.get(h, None)
+    ctx = _with_stack.get()
     if ctx:
         return ctx[-1].tag
     if default is _get_current_none:
@@ -551,4 +1287,4 @@ def attr(*args, **kwargs):
 
 
 # escape() is used in render
-from uidom.dom.src.utils.dom_util import escape
+from uidom.dom.src.utils.dom_util import escape, escape_attribute
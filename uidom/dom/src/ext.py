@@ -3,7 +3,10 @@
 # This software is released under the MIT License.
 # https://opensource.org/licenses/MIT
 
+import filecmp
+import itertools
 import re
+import sys
 import textwrap
 import typing
 from pathlib import Path
@@ -11,8 +14,15 @@ from pathlib import Path
 from jinja2.utils import htmlsafe_json_dumps
 
 from uidom.dom.src.dom1core import dom1core
-from uidom.dom.src.dom_tag import dom_tag, unicode
-from uidom.dom.src.utils.dom_util import dom_text, escape
+from uidom.dom.src.dom_tag import (
+    _RenderCache,
+    _enter_render,
+    _render_depth,
+    dom_tag,
+    unicode,
+)
+from uidom.dom.src.frozen import FrozenTag
+from uidom.dom.src.utils.dom_util import dom_text, escape, escape_attribute
 
 __all__ = [
     "SingleTemplates",
@@ -24,28 +34,232 @@ __all__ = [
 ]
 
 
+# normalized class strings, keyed by both the raw and the normalized string.
+# pages repeat the same tailwind classes on thousands of tags so identical
+# class strings share a single interned string
+_class_table = {}
+_class_table_size = 4096
+
+
+def _normalize_class(value):
+    if type(value) is not str:
+        # the stand-ins of compiled components (see compiled._Slot) are marked
+        # and normalized when placed, they can't be compared with the table keys
+        as_class = getattr(value, "_as_class", None)
+        if as_class is not None:
+            return as_class()
+        value = str(value)
+    try:
+        return _class_table[value]
+    except KeyError:
+        pass
+    # adding support to write multiline tailwindcss classes
+    normalized = sys.intern(re.sub(r"\s+", " ", textwrap.dedent(value).strip()))
+    if len(_class_table) >= _class_table_size:
+        _class_table.clear()
+    _class_table[value] = _class_table[normalized] = normalized
+    return normalized
+
+
+def _safe_attributes_changed():
+    # the kept attribute strings and fragments of every tag are rendered again
+    _RenderCache.current += 1
+
+
+def _prefix_map_changed():
+    AttributePrefixMap.version += 1
+
+
+class _WatchedDict(dict):
+    """
+    A dict that calls changed whenever its content changes, setting a value it
+    already holds changes nothing.
+    """
+
+    __slots__ = ("_changed",)
+
+    def __init__(self, changed, *args, **kwargs):
+        self._changed = changed
+        super(_WatchedDict, self).__init__(*args, **kwargs)
+
+    def __reduce__(self):
+        # copies and pickles are built again by the subclass, which passes changed
+        return type(self), (dict(self),)
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] != value:
+            super(_WatchedDict, self).__setitem__(key, value)
+            self._changed()
+
+    def __delitem__(self, key):
+        super(_WatchedDict, self).__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self._changed()
+        return super(_WatchedDict, self).pop(key, *default)
+
+    def popitem(self):
+        item = super(_WatchedDict, self).popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        if self:
+            super(_WatchedDict, self).clear()
+            self._changed()
+
+
+class SafeAttributes(_WatchedDict):
+    """
+    The safe_attributes of Tags (names of the attributes rendered without being
+    escaped). The dicts are shared by the classes and changed in place (ex. by
+    the alpinejs dataset), every change drops what the tags kept of their renders.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super(SafeAttributes, self).__init__(_safe_attributes_changed, *args, **kwargs)
+
+
+class AttributePrefixMap(_WatchedDict):
+    """
+    The attribute_prefix_map of Tags, every change drops the attribute names the
+    classes cleaned (see Tags._clean_attribute_name).
+    """
+
+    __slots__ = ()
+
+    # bumped on every change of any prefix map
+    version = 0
+
+    def __init__(self, *args, **kwargs):
+        super(AttributePrefixMap, self).__init__(_prefix_map_changed, *args, **kwargs)
+
+
 class Tags(dom_tag, dom1core):
+    # serialized attributes of the tag, dropped whenever an attribute changes
+    __slots__ = ("_attributes_string",)
+
+    # the class name is used as the tag name unless tagname is set
+    tagname = None
     left_delimiter = "<"
     right_delimiter = ">"
     self_dedent = False
     child_dedent = False
     render_tag = True
+    open_tag = False
+    close_tag = False
     new_line = "\n"
     SELF_DEDENT = "self_dedent"
     CHILD_DEDENT = "child_dedent"
     OPEN_TAG = "open_tag"
     CLOSE_TAG = "close_tag"
     RENDER_TAG = "render_tag"
+    SORT_ATTRIBUTES = "sort_attributes"
+    # these are passed like attributes but only control how the tag renders,
+    # they are kept on the tag itself so that rendering never has to pop them
+    RENDER_CONTROLS = frozenset(
+        [SELF_DEDENT, CHILD_DEDENT, OPEN_TAG, CLOSE_TAG, RENDER_TAG, SORT_ATTRIBUTES]
+    )
+    # attributes are rendered sorted by name, set it to False to keep the order
+    # they were set in when the order doesn't need to be deterministic
+    sort_attributes = True
     file_extension = ".html"
-    attribute_prefix_map: dict = {}
-    safe_attributes: dict = {}
+    attribute_prefix_map: dict = AttributePrefixMap()
+    safe_attributes: dict = SafeAttributes()
+    # cleaned attribute names kept per class, see _clean_attribute_name
+    attribute_name_cache_size = 1024
+
+    def __init_subclass__(cls, **kwargs):
+        super(Tags, cls).__init_subclass__(**kwargs)
+        safe_attributes = cls.__dict__.get("safe_attributes")
+        if safe_attributes is not None and type(safe_attributes) is not SafeAttributes:
+            cls.safe_attributes = SafeAttributes(safe_attributes)
+        prefix_map = cls.__dict__.get("attribute_prefix_map")
+        if prefix_map is not None and type(prefix_map) is not AttributePrefixMap:
+            cls.attribute_prefix_map = AttributePrefixMap(prefix_map)
 
     def __init__(self, *args, **kwargs):
         # if any(args):
         # msg = f"can only pass {dom_tag!r} or {str!r} types in arguments, got {args!r} instead"
         # if not all(map(lambda x: isinstance(x, (dom_tag, str)), args)):
         #     raise TypeError(msg)
+        self._attributes_string = None
+        cls = type(self)
+        if "_tag_name" not in cls.__dict__:
+            # the cleaned tag name is resolved once per class
+            cls._tag_name = self._clean_name(
+                cls.__name__ if cls.tagname is None else cls.tagname
+            )
         super(Tags, self).__init__(*args, **kwargs)
+        if self.tagname is not cls.tagname:
+            # tag name is overridden on the instance itself (ex. XTemplate)
+            self._tag_name = self._clean_name(self.tagname)
+
+    def set_attribute(self, key, value):
+        self._attributes_string = None
+        if key == "class" and isinstance(value, str):
+            # normalized once here so that rendering never has to touch it again
+            value = _normalize_class(value)
+        if key in Tags.RENDER_CONTROLS:
+            # clean_pair turns boolean True into the attribute name
+            setattr(self, key, True if value == key else value)
+            self._invalidate_render()
+        else:
+            super(Tags, self).set_attribute(key, value)
+
+    __setitem__ = set_attribute
+
+    def freeze(self):
+        """
+        Returns a pre-rendered copy of the tag that renders as a single append of
+        its html and can't be changed, see FrozenTag.
+        """
+        return FrozenTag(self)
+
+    def _clone_node(self, parent, memo):
+        node = super(Tags, self)._clone_node(parent, memo)
+        # the attributes of the clone are equal, so is their rendered string
+        node._attributes_string = self._attributes_string
+        return node
+
+    @property
+    def attributes(self):
+        # the dict can be changed directly once it's handed out
+        self._attributes_string = None
+        return dom_tag.attributes.fget(self)
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self._attributes_string = None
+        dom_tag.attributes.fset(self, attributes)
+
+    def delete_attribute(self, key):
+        self._attributes_string = None
+        if key in Tags.RENDER_CONTROLS:
+            # fallback to the class defined value
+            self.__dict__.pop(key, None)
+            self._invalidate_render()
+        else:
+            super(Tags, self).delete_attribute(key)
+
+    __delitem__ = delete_attribute
 
     def _render_open_tag(
         self,
@@ -72,31 +286,38 @@ class Tags(dom_tag, dom1core):
             )
         return sb
 
-    def _wrap_attr_value(self, value, indent_level, indent_str, pretty):
-        # adding support to write multiline tailwindcss classes
-        value = textwrap.dedent(value)
-        # value = textwrap.fill(
-        #     value,
-        #     break_long_words=False,
-        #     break_on_hyphens=False,
-        # )
-        value = re.sub(r"\s+", " ", value.strip())
-
-        return value
-
     def _render_attribute(self, sb, indent_level, indent_str, pretty):
-        for attribute, value in sorted(self.attributes.items()):
+        # (version of the safe_attributes, string) of the last render
+        kept = self._attributes_string
+        if kept is not None and kept[0] == _RenderCache.current:
+            sb.append(kept[1])
+            return sb
+        string = "".join(self._serialize_attributes([]))
+        if self._attributes_are_scalar():
+            self._attributes_string = (_RenderCache.current, string)
+        else:
+            self._attributes_string = None
+        sb.append(string)
+        return sb
+
+    def _attributes_are_scalar(self):
+        # a safe_attributes dict of the instance itself can change unseen
+        return type(self.safe_attributes) is SafeAttributes and super(
+            Tags, self
+        )._attributes_are_scalar()
+
+    def _serialize_attributes(self, sb):
+        attributes = self._attributes.items()
+        if self.sort_attributes:
+            attributes = sorted(attributes)
+        for attribute, value in attributes:
             if value is not False and value not in [
                 None
             ]:  # False values must be omitted completely
-                if attribute == "class":
-                    value = self._wrap_attr_value(
-                        value, indent_level, indent_str, pretty
-                    )
                 if not isinstance(value, (dict, list)):
                     if self.safe_attributes.get(attribute, True):
                         sb.append(
-                            ' %s="%s"' % (attribute, escape(unicode(value), True))
+                            ' %s="%s"' % (attribute, escape_attribute(unicode(value)))
                         )
                     else:
                         sb.append(' %s="%s"' % (attribute, unicode(value)))
@@ -133,6 +354,32 @@ class Tags(dom_tag, dom1core):
             indent_level -= 1
         return indent_level
 
+    @classmethod
+    def _clean_attribute_name(cls, attribute):
+        # clean_attribute is a pure function of the name for every class, so the
+        # names are cleaned once per class and the cache is dropped whenever
+        # attribute_prefix_map is changed or replaced. It's cleared once it holds
+        # attribute_name_cache_size names, as names can come from user input
+        prefix_map = cls.attribute_prefix_map
+        cache = cls.__dict__.get("_clean_attribute_cache")
+        if (
+            cache is None
+            or cache[0] is not prefix_map
+            or cache[2] != AttributePrefixMap.version
+        ):
+            cache = (prefix_map, {}, AttributePrefixMap.version)
+            cls._clean_attribute_cache = cache
+        names = cache[1]
+        try:
+            return names[attribute]
+        except KeyError:
+            pass
+        cleaned = cls.clean_attribute(attribute)
+        if len(names) >= cls.attribute_name_cache_size:
+            names.clear()
+        names[attribute] = cleaned
+        return cleaned
+
     @classmethod
     def clean_attribute(cls, attribute):
         """
@@ -213,117 +460,140 @@ class Tags(dom_tag, dom1core):
                 name = name[1:]
         return name
 
-    def _render_children(self, sb, indent_level, indent_str, pretty, xhtml):
-        # we want to partially inline only childrens so initially we set
-        # inline flag as True here but if child.is_line is False we will
-        # set this flag as False
-        inline = True
+    def _render_child(self, frame, sb, child, indent_str, xhtml):
+        """
+        Renders whatever comes before the child, and the child itself when the render
+        loop can't walk it. Returns True if the render loop should walk the child.
+        """
+        inline = frame.inline
+        indent_level = frame.indent_level
+        orig_indent = frame.orig_indent
+        pretty = frame.pretty
+        self_render_tag = frame.render_tag
+
+        if isinstance(child, dom_tag) and not isinstance(child, dom_text):
+            # Get the dedent status of child from the parent or the child.
+            # The dedent status of the child from the parent via self.child_dedent is
+            # extracted in the '_render' method already and is already taken care of.
+            # we have already **not** incremented the indentation in '_render_enter' method
+            # for the children of the frame if child_dedent is True. Thus
+            # in effect decrementing the child indentation.
+
+            # the dedent status of the child from the child via child.self_dedent is
+            # extracted here
+            child_self_dedent = getattr(child, Tags.SELF_DEDENT, False)
+
+            # check if we are pretty-fying the html and only then try to dedent the indentation
+            if pretty and not child.is_inline:
+                inline = False
+                # parent or child both can dedent the indentation, but childs value takes the presedence
+                # always so we are skipping self_child_dedent as its already dealt with in '_render' method
+                dedent = child_self_dedent
+                # incase if self.is_single flag is True the dedentation has already happended while
+                # opening the parent in "_render_enter" method by not incrementing indentation
+                # so we skip dedentation in case the parent has is_single flag True
+                if dedent and not self.is_single:
+                    # even while dedentation we will never dedent more than the original parent indentation
+                    # it is wrong syntax so we keep checking this
+                    # for example:
+                    # --------------- ** this can happen
+                    # "   "<parent>\n
+                    # "   "<child>
+                    # -----------
+                    # but not this notice how indentation before <child> is less than that of <parent>
+                    # "    "<parent>\n
+                    # "  "<child>
+
+                    # thus we always ensure that while we dedent the <child> we don't dedent it below
+                    # parent indentation
+                    if indent_level > orig_indent - 1:
+                        indent_level = self._dedent_handler(dedent, indent_level)
+
+            # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            # we will apply the changes only when the render_tag flag is set to True
+            # NOTE: we should **not add** checks for (pretty and not self.is_inline) here with
+            # 'self_render_tag' as this is where we are adding the indentation and
+            # new-line **before** child is rendered.
+            #
+            # ======================Lets see the reason behind this in details.======================
+            #
+            # variable 'pretty' comes from the parent and if we are rendering tag of parent
+            # for eg:
+            #
+            # =======================================================================================
+            # <parent>\n
+            # "    "<child> // so here '\n' and "    " represents the newline and indentation added
+            # <parent>      // after <parent> this is done here after checking 'self_render_tag'
+            # =======================================================================================
+            #
+            # also notice we do (inline and self.is_inline) check inside _new_line_and_inline_handler
+            # method because we want to make only childrens are partially inlined.
+            # if we dont add (inline and self.is_inline) we will get the tree something like this if
+            # parent.is_inline = False
+            #
+            # =======================================================================================
+            # <parent><child></child> // notice how the <child></child> tag is inlined but its mangling
+            # </parent>               // the indentation after opening of the <parent> tag
+            # =======================================================================================
+            #
+            # this is happening because when self.is_inline is False for parent we should add indentation
+            # and '\n' before the child, if 'child.is_inline' is True but not the 'parent.is_inline' then
+            # we need to make inline False in _new_line_and_inline_handler below to ensure that '\n' and
+            # indentation is added after opening of parent tag, but we have already overwritten inline = True
+            # in the starting and child.is_inline is True so in effect (pretty and not child.is_inline)
+            # condition is False so we didn't override value of inline which is still True.
+            #
+            # Thus if we only pass 'inline' inside _new_line_and_inline_handler it will not add any "\n"
+            # or indentation. Only way to do this is by adding "and" operator between inline and self.is_inline.
+            # Thus we make sure even if the child is inlined the parent adds the "\n" and indentation before
+            # child if parent self.is_inline is False.
+            #
+            # This can be quickly and easily checked by removing self.is_inline inside _new_line_and_inline_handler
+            # below and running div(div(div(div(script("aa")), __inline=True)))
+            # what we actually want is:
+            # -----------------------
+            # <parent>\n
+            # "    "<child></child>
+            # </parent>
+            # and we get this only by adding (inline and self.is_inline) inside _new_line_and_inline_handler
+            # method below so don't remove or edit it in future.
+            # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+            if self_render_tag:
+                if not isinstance(child, PlaceholderTag) or (
+                    isinstance(child, PlaceholderTag) and any(child)
+                ):
+                    sb, inline = self._new_line_and_inline_handler(
+                        sb,
+                        indent_level,
+                        indent_str,
+                        pretty,
+                        inline and self.is_inline,
+                    )
 
-        # we want to keep track of indentation level so that we dont dedent the child
-        # below original indentation level of the parent
-        orig_indent = indent_level
+            frame.inline = inline
+            frame.indent_level = indent_level
+            if isinstance(child, Tags) and type(child)._render is Tags._render:
+                return True
+            # tags with their own '_render' (ex. lazy) render themselves
+            child._render(sb, indent_level, indent_str, pretty, xhtml)
+            return False
 
-        self_render_tag = self.attributes.pop(
-            Tags.RENDER_TAG,
-            getattr(self, Tags.RENDER_TAG) if hasattr(self, Tags.RENDER_TAG) else True,
-        )
-        for child in self.children:
-            if isinstance(child, dom_tag) and not isinstance(child, dom_text):
-                # Get the dedent status of child from the parent or the child.
-                # The dedent status of the child from the parent via self.child_dedent is
-                # extracted in the '_render' method already and is already taken care of.
-                # we have already **not** incremented the indentation in '__render' method
-                # while calling '_render_childern' method if child_dedent is True. Thus
-                # in effect decrementing the child indentation.
-
-                # the dedent status of the child from the child via child.self_dedent is
-                # extracted here
-                child_self_dedent = child.attributes.pop(
-                    Tags.SELF_DEDENT,
-                    getattr(child, Tags.SELF_DEDENT)
-                    if hasattr(child, Tags.SELF_DEDENT)
-                    else False,
-                )
+        else:
+            if isinstance(child, dom_text):
+                child = child.__render__()
 
-                # check if we are pretty-fying the html and only then try to dedent the indentation
-                if pretty and not child.is_inline:
+            # check if the child is not an empty string '' via if child:
+            if child or any(child):
+                # if any child exists maybe its a string or some object, here we check if the pretty is True.
+                # Notice here the child is only string or we force it to act like string by casting it into unicode and
+                # we can't check child.is_inline so we fallback on 'pretty' flag. if its True we set the inline flag as
+                # False. The logic of adding (inline and self.is_inline) inside _new_line_and_inline_handler is same as
+                # given above. Ideally we should check for both (pretty and not self.is_inline) but due to the fact that
+                # 'pretty' has included that condition when its defined we skip it.
+
+                if pretty:
                     inline = False
-                    # parent or child both can dedent the indentation, but childs value takes the presedence
-                    # always so we are skipping self_child_dedent as its already dealt with in '_render' method
-                    dedent = child_self_dedent
-                    # incase if self.is_single flag is True the dedentation has already happended while
-                    # calling "_render_children" inside "_render" method by not incrementing indentation
-                    # so we skip dedentation in case the parent has is_single flag True
-                    if dedent and not self.is_single:
-                        # even while dedentation we will never dedent more than the original parent indentation
-                        # it is wrong syntax so we keep checking this
-                        # for example:
-                        # --------------- ** this can happen
-                        # "   "<parent>\n
-                        # "   "<child>
-                        # -----------
-                        # but not this notice how indentation before <child> is less than that of <parent>
-                        # "    "<parent>\n
-                        # "  "<child>
-
-                        # thus we always ensure that while we dedent the <child> we don't dedent it below
-                        # parent indentation
-                        if indent_level > orig_indent - 1:
-                            indent_level = self._dedent_handler(dedent, indent_level)
-
-                # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                # we will apply the changes only when the render_tag flag is set to True
-                # NOTE: we should **not add** checks for (pretty and not self.is_inline) here with
-                # 'self_render_tag' as this is where we are adding the indentation and
-                # new-line **before** child is rendered.
-                #
-                # ======================Lets see the reason behind this in details.======================
-                #
-                # variable 'pretty' comes from the parent and if we are rendering tag of parent
-                # for eg:
-                #
-                # =======================================================================================
-                # <parent>\n
-                # "    "<child> // so here '\n' and "    " represents the newline and indentation added
-                # <parent>      // after <parent> this is done here after checking 'self_render_tag'
-                # =======================================================================================
-                #
-                # also notice we do (inline and self.is_inline) check inside _new_line_and_inline_handler
-                # method because we want to make only childrens are partially inlined.
-                # if we dont add (inline and self.is_inline) we will get the tree something like this if
-                # parent.is_inline = False
-                #
-                # =======================================================================================
-                # <parent><child></child> // notice how the <child></child> tag is inlined but its mangling
-                # </parent>               // the indentation after opening of the <parent> tag
-                # =======================================================================================
-                #
-                # this is happening because when self.is_inline is False for parent we should add indentation
-                # and '\n' before the child, if 'child.is_inline' is True but not the 'parent.is_inline' then
-                # we need to make inline False in _new_line_and_inline_handler below to ensure that '\n' and
-                # indentation is added after opening of parent tag, but we have already overwritten inline = True
-                # in the starting and child.is_inline is True so in effect (pretty and not child.is_inline)
-                # condition is False so we didn't override value of inline which is still True.
-                #
-                # Thus if we only pass 'inline' inside _new_line_and_inline_handler it will not add any "\n"
-                # or indentation. Only way to do this is by adding "and" operator between inline and self.is_inline.
-                # Thus we make sure even if the child is inlined the parent adds the "\n" and indentation before
-                # child if parent self.is_inline is False.
-                #
-                # This can be quickly and easily checked by removing self.is_inline inside _new_line_and_inline_handler
-                # below and running div(div(div(div(script("aa")), __inline=True)))
-                # what we actually want is:
-                # -----------------------
-                # <parent>\n
-                # "    "<child></child>
-                # </parent>
-                # and we get this only by adding (inline and self.is_inline) inside _new_line_and_inline_handler
-                # method below so don't remove or edit it in future.
-                # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                if self_render_tag:
-                    if not isinstance(child, PlaceholderTag) or (
-                        isinstance(child, PlaceholderTag) and any(child)
-                    ):
+                    if self_render_tag:
                         sb, inline = self._new_line_and_inline_handler(
                             sb,
                             indent_level,
@@ -331,25 +601,10 @@ class Tags(dom_tag, dom1core):
                             pretty,
                             inline and self.is_inline,
                         )
-
-                child._render(sb, indent_level, indent_str, pretty, xhtml)
-
-            else:
-                if isinstance(child, dom_text):
-                    child = child.__render__()
-
-                # check if the child is not an empty string '' via if child:
-                if child or any(child):
-                    # if any child exists maybe its a string or some object, here we check if the pretty is True.
-                    # Notice here the child is only string or we force it to act like string by casting it into unicode and
-                    # we can't check child.is_inline so we fallback on 'pretty' flag. if its True we set the inline flag as
-                    # False. The logic of adding (inline and self.is_inline) inside _new_line_and_inline_handler is same as
-                    # given above. Ideally we should check for both (pretty and not self.is_inline) but due to the fact that
-                    # 'pretty' has included that condition when its defined we skip it.
-
-                    if pretty:
-                        inline = False
-                        if self_render_tag:
+                    lines = child.splitlines()
+                    for line in lines:
+                        sb.append(unicode(line))
+                        if line and line != lines[-1]:
                             sb, inline = self._new_line_and_inline_handler(
                                 sb,
                                 indent_level,
@@ -357,108 +612,88 @@ class Tags(dom_tag, dom1core):
                                 pretty,
                                 inline and self.is_inline,
                             )
-                        lines = child.splitlines()
-                        for line in lines:
-                            sb.append(unicode(line))
-                            if line and line != lines[-1]:
-                                sb, inline = self._new_line_and_inline_handler(
-                                    sb,
-                                    indent_level,
-                                    indent_str,
-                                    pretty,
-                                    inline and self.is_inline,
-                                )
-                    else:
-                        sb.append(unicode(child))
-
-            if child or any(child):
-                # don't use any(child) alone as condition above because it will check
-                # __iter__ method and it will depend on its children solely so will not work as expected
-                if not isinstance(child, PlaceholderTag) or (
-                    isinstance(child, PlaceholderTag) and any(child)
+                else:
+                    sb.append(unicode(child))
+
+        frame.inline = inline
+        self._render_after_child(frame, sb, child, indent_str)
+        return False
+
+    def _render_after_child(self, frame, sb, child, indent_str):
+        inline = frame.inline
+        indent_level = frame.indent_level
+        pretty = frame.pretty
+        self_render_tag = frame.render_tag
+
+        if child or any(child):
+            # don't use any(child) alone as condition above because it will check
+            # __iter__ method and it will depend on its children solely so will not work as expected
+            if not isinstance(child, PlaceholderTag) or (
+                isinstance(child, PlaceholderTag) and any(child)
+            ):
+                if (
+                    not self_render_tag
+                    and pretty
+                    and self._children
+                    and self._children[-1] != child
                 ):
-                    if (
-                        not self_render_tag
-                        and pretty
-                        and self.children
-                        and self.children[-1] != child
-                    ):
-                        sb, inline = self._new_line_and_inline_handler(
-                            sb,
-                            indent_level,
-                            indent_str,
-                            pretty,
-                            inline and self.is_inline,
-                        )
+                    sb, inline = self._new_line_and_inline_handler(
+                        sb,
+                        indent_level,
+                        indent_str,
+                        pretty,
+                        inline and self.is_inline,
+                    )
 
-        return inline
+        frame.inline = inline
+
+    def _render_enter(self, sb, indent_level, indent_str, pretty, xhtml):
+        """
+        Renders the open tag and returns the frame used by the render loop to walk
+        the children, or None if the cached fragment was rendered instead.
+        """
+        self._before_render()
 
-    def _render(self, sb, indent_level=1, indent_str="  ", pretty=True, xhtml=False):
-        self.open_tag = self.attributes.pop(
-            Tags.OPEN_TAG,
-            getattr(self, Tags.OPEN_TAG) if hasattr(self, Tags.OPEN_TAG) else False,
-        )
-        self.close_tag = self.attributes.pop(
-            Tags.CLOSE_TAG,
-            getattr(self, Tags.CLOSE_TAG) if hasattr(self, Tags.CLOSE_TAG) else False,
-        )
         # prettify only if _render method has pretty=True
         pretty = pretty and self.is_pretty and not self.is_inline
 
-        # take out the 'self_dedent' attribute from the self.attributes if any present else fallback to
-        # class defined 'self_dedent' if any present else fallback to False
-        self_dedent = self.attributes.pop(
-            Tags.SELF_DEDENT,
-            getattr(self, Tags.SELF_DEDENT)
-            if hasattr(self, Tags.SELF_DEDENT)
-            else False,
-        )
-
-        # assignment to self.self_dedent is necessary to ensure that next time
-        # when the self_dedent is popped from attribute it will fallback to the currently assigned value
-        self.self_dedent = self_dedent
-
-        # take out the 'child_dedent' attribute from the self.attributes if any present else fallback to
-        # class defined 'child_dedent' if any present else fallback to False
-        self_child_dedent = self.attributes.pop(
-            Tags.CHILD_DEDENT,
-            getattr(self, Tags.CHILD_DEDENT)
-            if hasattr(self, Tags.CHILD_DEDENT)
-            else False,
-        )
-
-        # assignment to self.child_dedent is necessary to ensure that next time
-        # when the child_dedent is popped from attribute it will fallback to the currently assigned value
-        # if the value is popped again
-        self.child_dedent = self_child_dedent
-
-        # take out the 'render_tag' attribute from the self.attributes if any present else fallback to
-        # class defined 'render_tag' if any present else fallback to True
-        self_render_tag = self.attributes.pop(
-            Tags.RENDER_TAG,
-            getattr(self, Tags.RENDER_TAG) if hasattr(self, Tags.RENDER_TAG) else True,
-        )
+        # reuse the fragment of the last render if nothing changed since then
+        key = self._render_cache_key(indent_level, indent_str, pretty, xhtml)
+        cache = self._render_cache
+        if (
+            cache is not None
+            and cache.version == _RenderCache.current
+            and key in cache
+        ):
+            sb.append(cache[key])
+            return None
+        start = len(sb)
+
+        # 'self_dedent', 'child_dedent' and 'render_tag' are never kept in self.attributes,
+        # see 'set_attribute', so they are either set on the instance or fallback to the
+        # class defined values
+        self_child_dedent = self.child_dedent
+        self_render_tag = self.render_tag
 
         # now if "render_tag" is False or self_dedent is True for any reason we will reduce the indentation
         # level but we will not mess with the self_dedent here as is_single flag ensures single tags are
-        # dedented by default (see '_render_children' method call below) so what remains is the double tags
+        # dedented by default (see the frame returned below) so what remains is the double tags
         # but we dedent double tags only when there is a child involved thus child.self_dedent is parsed
-        # inside '_render_children' method, thats why commenting.
+        # inside '_render_child' method, thats why commenting.
         dedent = not self_render_tag  # or self_dedent
         if pretty and dedent:
             # A **Potential BUG** that we can introduce here is if we dedent to the level below parent element.
             # Baically we are assuming that the parent has sent the indent level to us after incrementing it
             # and when we are not rendering self-tag, we are decrementing it. And thats the actual case.
             # Personally I dont think there will be any bug here as we can be sure that "_render" method is run
-            # inside "_render_children", and when it happes, child takes care of its indentation and all,
+            # for a child of the parent frame, and when it happes, child takes care of its indentation and all,
             # so leave it while it works. Don't remove the line below it breaks indentation in the code. :)
             indent_level = self._dedent_handler(dedent, indent_level)
 
         if self_render_tag:
-            name = self._clean_name(getattr(self, "tagname", type(self).__name__))
             self._render_open_tag(
                 sb=sb,
-                name=name,
+                name=self._tag_name,
                 open_tag=self.open_tag,
                 xhtml=xhtml,
                 indent_level=indent_level,
@@ -466,23 +701,176 @@ class Tags(dom_tag, dom1core):
                 pretty=pretty,
             )
 
-        inline = self._render_children(
-            sb,
-            indent_level + 1
+        return _RenderFrame(
+            self,
+            start=start,
+            key=key,
+            pretty=pretty,
+            render_tag=self_render_tag,
+            own_indent=indent_level,
+            indent_level=indent_level + 1
             if not self.is_single or not self_child_dedent
             else indent_level,
-            indent_str,
-            pretty,
-            xhtml,
         )
-        inline = self.is_inline and inline
+
+    def _render_exit(self, frame, sb, indent_str):
+        indent_level = frame.own_indent
+        pretty = frame.pretty
+        self_render_tag = frame.render_tag
+
+        inline = self.is_inline and frame.inline
         if self_render_tag and not self.is_single:
             sb, inline = self._new_line_and_inline_handler(
                 sb, indent_level, indent_str, pretty, inline
             )
-            name = self._clean_name(getattr(self, "tagname", type(self).__name__))
-            self._render_close_tag(sb=sb, name=name, close_tag=self.close_tag)
+            self._render_close_tag(sb=sb, name=self._tag_name, close_tag=self.close_tag)
+
+        self._cache_render(frame.key, sb, frame.start)
+
+    def _render_minified(self, sb, xhtml=False, stream=False):
+        """
+        Renders the tag without any whitespace, this skips the indentation, inline and
+        dedent bookkeeping of the pretty render entirely so every pretty=False render
+        goes through here.
+        """
+        # without pretty every tag shares the same cache key
+        key = self._render_cache_key(0, "", False, xhtml)
+        stack = []
+        tag = self
+        while True:
+            if tag is not None:
+                if stream and tag.is_pending:
+                    parent = stack[-1][0] if stack else None
+                    if parent is not None:
+                        position = dom_tag._child_index(parent, tag)
+                    # the caller awaits it before the render goes on
+                    yield tag
+                    if parent is not None and tag.parent is not parent:
+                        # replaced while it was awaited (ex. by the entry of an
+                        # async component), the walk goes on from its position
+                        parent, _, start = stack[-1]
+                        children = itertools.islice(parent._children, position, None)
+                        stack[-1] = (parent, children, start)
+                        tag = None
+                        continue
+                tag._before_render()
+                cache = tag._render_cache
+                if (
+                    cache is not None
+                    and cache.version == _RenderCache.current
+                    and key in cache
+                ):
+                    sb.append(cache[key])
+                    if stream:
+                        yield tag
+                else:
+                    start = len(sb)
+                    if tag.render_tag:
+                        tag._render_open_tag(
+                            sb=sb,
+                            name=tag._tag_name,
+                            open_tag=tag.open_tag,
+                            xhtml=xhtml,
+                            indent_level=0,
+                            indent_str="",
+                            pretty=False,
+                        )
+                    stack.append((tag, iter(tag._children), start))
+                tag = None
+
+            if not stack:
+                return
+
+            parent, children, start = stack[-1]
+            for child in children:
+                if isinstance(child, Tags) and type(child)._render is Tags._render:
+                    tag = child
+                    break
+                elif isinstance(child, dom_text):
+                    sb.append(child.text)
+                elif isinstance(child, dom_tag):
+                    # tags with their own '_render' (ex. lazy) render themselves
+                    child._render(sb, 0, "", False, xhtml)
+                elif child or any(child):
+                    sb.append(unicode(child))
+            else:
+                if parent.render_tag and not parent.is_single:
+                    parent._render_close_tag(
+                        sb=sb, name=parent._tag_name, close_tag=parent.close_tag
+                    )
+                parent._cache_render(key, sb, start)
+                stack.pop()
+                if stream:
+                    yield parent
+
+    def _render_pretty(self, sb, indent_level, indent_str, xhtml, stream=False):
+        # the tree is walked with an explicit stack of frames instead of recursing
+        # into every child, so deeply nested pages never hit the recursion limit
+        if stream and self.is_pending:
+            yield self
+        frame = self._render_enter(sb, indent_level, indent_str, True, xhtml)
+        if frame is None:
+            if stream:
+                yield self
+            return
+
+        stack = [frame]
+        while stack:
+            frame = stack[-1]
+            tag = frame.tag
+            if frame.child is not None:
+                # back from walking the child
+                tag._render_after_child(frame, sb, frame.child, indent_str)
+                frame.child = None
+
+            if frame.index < len(tag._children):
+                child = tag._children[frame.index]
+                frame.index += 1
+                if stream and isinstance(child, dom_tag) and child.is_pending:
+                    # awaited by the caller before anything of it is rendered, the
+                    # new line before it depends on its children
+                    yield child
+                    if child.parent is not tag:
+                        # replaced while it was awaited (ex. by the entry of an
+                        # async component), the walk goes on from its position
+                        frame.index -= 1
+                        continue
+                if tag._render_child(frame, sb, child, indent_str, xhtml):
+                    frame.child = child
+                    child_frame = child._render_enter(
+                        sb, frame.indent_level, indent_str, frame.pretty, xhtml
+                    )
+                    if child_frame is not None:
+                        stack.append(child_frame)
+                    elif stream:
+                        yield child
+                continue
+
+            tag._render_exit(frame, sb, indent_str)
+            stack.pop()
+            if stream:
+                yield tag
+
+    def _iter_render(
+        self,
+        sb,
+        indent_level=1,
+        indent_str="  ",
+        pretty=True,
+        xhtml=False,
+        stream=False,
+    ):
+        if not pretty:
+            return self._render_minified(sb, xhtml, stream)
+        return self._render_pretty(sb, indent_level, indent_str, xhtml, stream)
 
+    def _render(self, sb, indent_level=1, indent_str="  ", pretty=True, xhtml=False):
+        token = _enter_render()
+        try:
+            for _ in self._iter_render(sb, indent_level, indent_str, pretty, xhtml):
+                pass
+        finally:
+            _render_depth.reset(token)
         return sb
 
     def __and__(self, other: dom_tag) -> "Tags":
@@ -544,20 +932,58 @@ class Tags(dom_tag, dom1core):
                 file_or_dir / _filename() if file_or_dir.is_dir() else file_or_dir
             )
 
-        html_string = self.__render__()
+        # the html is streamed into a temporary file first, the old file is only
+        # replaced when the html has changed
+        temp_path = file_path.with_name(f"{file_path.name}.tmp")
+        with temp_path.open(mode="wb") as f:
+            self.render_into(f)
 
-        if not file_path.exists():
-            with file_path.open(mode="w+") as f:
-                f.write(html_string)
+        if file_path.exists() and filecmp.cmp(temp_path, file_path, shallow=False):
+            temp_path.unlink()
         else:
-            with file_path.open(mode="r") as temp:
-                old_html = temp.read()
-                if old_html != html_string:
-                    with file_path.open(mode="w") as f:
-                        f.write(html_string)
+            temp_path.replace(file_path)
         return file_path.name
 
 
+class _RenderFrame(object):
+    """
+    State of a tag while the render loop walks its children.
+    """
+
+    __slots__ = (
+        "tag",
+        "start",
+        "key",
+        "pretty",
+        "render_tag",
+        "own_indent",
+        "indent_level",
+        "orig_indent",
+        "inline",
+        "index",
+        "child",
+    )
+
+    def __init__(self, tag, start, key, pretty, render_tag, own_indent, indent_level):
+        self.tag = tag
+        self.start = start  # len(sb) when the tag started rendering
+        self.key = key
+        self.pretty = pretty
+        self.render_tag = render_tag
+        # indentation of the tag itself, used to close it
+        self.own_indent = own_indent
+        # indentation of the children, a child with self_dedent lowers it
+        # but never below orig_indent - 1
+        self.indent_level = indent_level
+        self.orig_indent = indent_level
+        # we want to partially inline only childrens so initially we set
+        # inline flag as True here but if child.is_line is False it is set False
+        self.inline = True
+        self.index = 0
+        # child being walked by the render loop
+        self.child = None
+
+
 class PlaceholderTag(Tags):
     render_tag = False
 
@@ -723,13 +1149,15 @@ class StyleTags(Tags):
             else f"{indent_str}{self.attribute_joiner}\n" + (indent_str * indent_level)
         )
 
-        attribute_items = self.attributes.items()
+        attribute_items = self._attributes.items()
 
         for attribute, value in attribute_items:
             if (
                 value is not False and value is not None
             ):  # False values must be omitted completely
-                sb.append(attribute_joiner % (attribute, escape(unicode(value), True)))
+                sb.append(
+                    attribute_joiner % (attribute, escape_attribute(unicode(value)))
+                )
 
             if value is None:  # minified xhtml attributes are added
                 sb.append(" %s" % attribute)
@@ -757,11 +1185,13 @@ class StyleTags(Tags):
         r = []
         attribute_joiner = self.attribute_joiner
 
-        for attribute, value in self.attributes.items():
+        for attribute, value in self._attributes.items():
             if (
                 value is not False and value is not None
             ):  # False values must be omitted completely
-                r.append(attribute_joiner % (attribute, escape(unicode(value), True)))
+                r.append(
+                    attribute_joiner % (attribute, escape_attribute(unicode(value)))
+                )
 
             if value is None:  # minified xhtml attributes are added
                 r.append(" %s" % attribute)
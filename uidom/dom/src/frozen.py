@@ -0,0 +1,96 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from uidom.dom.src.dom_tag import _no_attributes, _no_children, dom_tag
+
+__all__ = ["FrozenTag"]
+
+
+class FrozenTag(dom_tag):
+    """
+    A pre-rendered copy of a tree of tags (see Tags.freeze), rendered as a single
+    append of its html. It can't be changed and holds no parent, so the same node
+    can be placed in any number of pages, threads and requests at once.
+
+    A copy of the tags it was made from is kept in tree, get and find leave
+    them out unless they are called with frozen=True. The node renders from a
+    copy of its own, so changing the tags of tree changes nothing it renders.
+    """
+
+    is_frozen = True
+
+    def __init__(self, tree):
+        super(FrozenTag, self).__init__()
+        # a copy, so changes made to the tags afterwards don't show. Indentations
+        # other than the ones below are rendered on first use, from this copy
+        # that is never handed out so that every indentation renders the same
+        self._tree = tree.clone()
+        self._tree_copy = None
+        # the parent adds the indentation and new lines around the node as it
+        # would around the tags
+        for name in ("is_inline", "is_pretty", "self_dedent"):
+            if hasattr(type(tree), name) or name in tree.__dict__:
+                self.__dict__[name] = getattr(tree, name)
+        # html by render cache key, pretty at the top level and minified are
+        # rendered now, the other indentations on first use
+        self._html = {}
+        self._html_of(0, "  ", True, False)
+        self._html_of(0, "", False, False)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {self._tree!r}>"
+
+    @property
+    def tree(self):
+        """
+        A copy of the frozen tags, made on first use.
+        """
+        if self._tree_copy is None:
+            self._tree_copy = self._tree.clone()
+        return self._tree_copy
+
+    def _html_of(self, indent_level, indent_str, pretty, xhtml):
+        pretty = pretty and self.is_pretty
+        key = self._render_cache_key(indent_level, indent_str, pretty, xhtml)
+        html = self._html.get(key)
+        if html is None:
+            # renders running at once in other threads may render it as well,
+            # they get the same html
+            html = "".join(
+                self._tree._render([], indent_level, indent_str, pretty, xhtml)
+            )
+            self._html[key] = html
+        return html
+
+    def _render(self, sb, indent_level, indent_str, pretty, xhtml):
+        sb.append(self._html_of(indent_level, indent_str, pretty, xhtml))
+        return sb
+
+    def _render_is_cached(self):
+        return True
+
+    # the node is shared by the trees it is added to, it belongs to none of them
+    @property
+    def parent(self):
+        return None
+
+    @parent.setter
+    def parent(self, parent):
+        pass
+
+    @property
+    def attributes(self):
+        return _no_attributes
+
+    @property
+    def children(self):
+        return _no_children
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError("%s is read-only" % type(self).__name__)
+
+    add = insert = remove = clear = add_raw_string = _frozen
+    set_attribute = __setitem__ = delete_attribute = __delitem__ = _frozen
+    __enter__ = setdocument = index_document = _frozen
@@ -323,7 +323,7 @@ class head(html_tag):
     The head element represents a collection of metadata for the document.
     """
 
-    pass
+    stream_flush = True
 
 
 class title(html_tag):
@@ -0,0 +1,162 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import threading
+import time
+import typing
+from collections import OrderedDict, namedtuple
+
+from uidom.dom.src.dom_tag import dom_tag
+
+__all__ = ["RenderMemo", "memoize_render"]
+
+
+MemoInfo = namedtuple("MemoInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _Entry(typing.NamedTuple):
+    result: typing.Any
+    expires: typing.Optional[float]
+    tags: frozenset
+
+
+def _clone_result(result):
+    if isinstance(result, dom_tag):
+        return result.clone()
+    if isinstance(result, (list, tuple)):
+        return type(result)(_clone_result(item) for item in result)
+    return result
+
+
+class RenderMemo(object):
+    """
+    Keeps what the render of a component returned, keyed by the component class
+    and its arguments, so a component called again with the same arguments
+    starts from a clone of the kept tags instead of running its render. The
+    component is still a new tag that joins the with block it is created in.
+
+    Only calls whose arguments are hashable and aren't tags are kept. Entries
+    are dropped when there are more than maxsize of them (least recently used
+    first), when they are older than ttl seconds, or through invalidate. tags
+    is a function of the arguments of the render returning the labels of the
+    entry, the name of the component class is always one of them.
+
+        @memoize_render(maxsize=256, ttl=60, tags=lambda user: [f"user:{user}"])
+        class Profile(Component):
+            def render(self, user):
+                ...
+
+        Profile.memo.invalidate(tag="user:42")
+    """
+
+    def __init__(self, maxsize=128, ttl=None, tags=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tags = tags
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.info()}>"
+
+    @staticmethod
+    def key(component, args, kwargs):
+        """
+        The key of a call of component, None if the call can't be kept.
+        """
+        values = (*args, *kwargs.values())
+        if any(isinstance(value, dom_tag) for value in values):
+            # the tags would be moved into the render, a clone leaves them out
+            return None
+        key = (component, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """
+        Returns a clone of the result kept under key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.expires is not None and entry.expires <= time.monotonic()
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _clone_result(entry.result)
+
+    def set(self, key, result, args=(), kwargs=None):
+        """
+        Keeps a clone of result under key, labelled with the tags of the call.
+        """
+        kwargs = kwargs or {}
+        tags = {key[0].__name__}
+        if self.tags is not None:
+            tags.update(self.tags(*args, **kwargs))
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        result = _clone_result(result)
+        for tag in result if isinstance(result, (list, tuple)) else (result,):
+            if isinstance(tag, dom_tag):
+                # the clones made from the entry keep the rendered fragments
+                tag.__render__(pretty=False)
+        entry = _Entry(result, expires, frozenset(tags))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None, tag=None):
+        """
+        Drops the entry kept under key and the entries labelled with tag, or
+        every entry when neither is given. Returns the number of entries dropped.
+        """
+        with self._lock:
+            if key is None and tag is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = set()
+            if key is not None and key in self._entries:
+                keys.add(key)
+            if tag is not None:
+                keys.update(k for k, e in self._entries.items() if tag in e.tags)
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return MemoInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+def memoize_render(maxsize=128, ttl=None, tags=None):
+    """
+    Class decorator keeping the renders of a component in a RenderMemo, the
+    memo is the memo attribute of the class.
+    """
+
+    def decorator(component):
+        component.memo = RenderMemo(maxsize=maxsize, ttl=ttl, tags=tags)
+        return component
+
+    return decorator
@@ -0,0 +1,203 @@
+# Copyright (c) 2022 uidom
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import re
+from functools import lru_cache
+
+from uidom.dom.src.dom_tag import dom_tag
+
+__all__ = ["compile_selector", "select"]
+
+
+# one simple selector or combinator of a css selector at a time
+_token = re.compile(
+    r"""
+    \s*(?P<combinator>[>,])\s*
+    | (?P<descendant>\s+)
+    | (?P<tag>\*|[A-Za-z_][\w-]*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<cls>[\w-]+)
+    | \[\s*(?P<attribute>[^\s=\]]+)\s*
+      (?:=\s*(?P<value>"[^"]*"|'[^']*'|[^\s\]]+)\s*)?\]
+    """,
+    re.VERBOSE,
+)
+
+
+def _tag_name(element):
+    name = getattr(element, "_tag_name", None)
+    if name is None:
+        name = getattr(element, "tagname", None) or type(element).__name__
+    return name
+
+
+def _is_element(node):
+    # tags that don't render themselves (components, placeholders) are left out
+    # and their children take their place, as in the rendered html
+    return isinstance(node, dom_tag) and getattr(node, "render_tag", True)
+
+
+def _compile_compound(name, ident, classes, attributes):
+    """
+    Returns a test of a single element for a compound selector (ex. div#a.b[c]).
+    """
+    if name == "*":
+        name = None
+    elif name is not None:
+        name = name.lower()
+    if ident is not None:
+        attributes.insert(0, ("id", ident))
+    classes = set(classes)
+
+    def test(element):
+        if name is not None and _tag_name(element).lower() != name:
+            return False
+        attrs = element._attributes
+        for key, value in attributes:
+            current = attrs.get(key)
+            if current is None or current is False:
+                return False
+            if value is not None and str(current) != value:
+                return False
+        if classes and not classes.issubset(str(attrs.get("class", "")).split()):
+            return False
+        return True
+
+    return test
+
+
+def _compile_complex(tests, combinators):
+    """
+    Returns a test of an element and the list of its rendered ancestors (outermost
+    first) for a selector with combinators, tests[i] and tests[i + 1] are joined
+    by combinators[i].
+    """
+    last = tests[-1]
+    if len(tests) == 1:
+        return lambda element, ancestors: last(element)
+
+    def match(i, pos, ancestors):
+        # tests[i] has to match ancestors[pos], or any ancestor above it when
+        # the combinator is a descendant one
+        if i < 0:
+            return True
+        test = tests[i]
+        if combinators[i] == ">":
+            return (
+                pos >= 0 and test(ancestors[pos]) and match(i - 1, pos - 1, ancestors)
+            )
+        while pos >= 0:
+            if test(ancestors[pos]) and match(i - 1, pos - 1, ancestors):
+                return True
+            pos -= 1
+        return False
+
+    def matcher(element, ancestors):
+        return last(element) and match(len(tests) - 2, len(ancestors) - 1, ancestors)
+
+    return matcher
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector):
+    """
+    Compiles css selectors into a test of an element and the list of its rendered
+    ancestors. Supports tag, *, #id, .class, [attr], [attr=value], the descendant
+    and child (>) combinators and selector lists separated by commas.
+    """
+    groups = []
+    tests, combinators = [], []
+    compound = None
+    combinator = None
+
+    def close_compound():
+        if compound is None:
+            raise ValueError(f"invalid css selector {selector!r}")
+        tests.append(_compile_compound(*compound))
+
+    text = selector.strip()
+    pos = 0
+    while pos < len(text):
+        token = _token.match(text, pos)
+        if token is None:
+            raise ValueError(f"invalid css selector {selector!r} at {text[pos:]!r}")
+        pos = token.end()
+
+        if token.group("combinator") == "," or token.group("combinator") == ">":
+            close_compound()
+            compound = None
+            if token.group("combinator") == ",":
+                groups.append(_compile_complex(tests, combinators))
+                tests, combinators = [], []
+            else:
+                combinators.append(">")
+            continue
+        if token.group("descendant") is not None:
+            close_compound()
+            compound = None
+            combinators.append(" ")
+            continue
+
+        if compound is None:
+            compound = (None, None, [], [])
+        name, ident, classes, attributes = compound
+        if token.group("tag") is not None:
+            if name is not None or ident is not None or classes or attributes:
+                raise ValueError(f"invalid css selector {selector!r}")
+            compound = (token.group("tag"), ident, classes, attributes)
+        elif token.group("id") is not None:
+            compound = (name, token.group("id"), classes, attributes)
+        elif token.group("cls") is not None:
+            classes.append(token.group("cls"))
+        else:
+            value = token.group("value")
+            if value is not None and value[0] in "\"'":
+                value = value[1:-1]
+            attributes.append((token.group("attribute"), value))
+
+    close_compound()
+    groups.append(_compile_complex(tests, combinators))
+    if len(groups) == 1:
+        return groups[0]
+    return lambda element, ancestors: any(
+        matcher(element, ancestors) for matcher in groups
+    )
+
+
+def select(root, selector):
+    """
+    Yields the elements under root that match the css selector in document order.
+    """
+    matcher = compile_selector(selector)
+
+    # rendered ancestors of root are part of the match (ex. "body div" on a div)
+    ancestors = []
+    node = root
+    while node is not None:
+        if _is_element(node):
+            ancestors.append(node)
+        node = node.parent
+    ancestors.reverse()
+
+    # the real children are walked as render does, the tags a component renders
+    # are not reachable through __iter__
+    stack = [(iter(root._children), False)]
+    while stack:
+        children, is_element = stack[-1]
+        for child in children:
+            if isinstance(child, dom_tag):
+                break
+        else:
+            stack.pop()
+            if is_element:
+                ancestors.pop()
+            continue
+
+        is_element = _is_element(child)
+        if is_element:
+            if matcher(child, ancestors):
+                yield child
+            ancestors.append(child)
+        stack.append((iter(child._children), is_element))
@@ -7,7 +7,9 @@
 import typing as T
 from asyncio import iscoroutinefunction
 from functools import wraps
+from io import BytesIO
 
+import anyio
 from starlette.background import BackgroundTask
 from starlette.responses import HTMLResponse as StarletteHTMLResponse
 from starlette.responses import StreamingResponse as StarletteStreamingResponse
@@ -20,7 +22,16 @@ CallableType = T.TypeVar("CallableType", bound=T.Callable[..., T.Any])
 
 
 class HTMLResponse(StarletteHTMLResponse):
+    """
+    Sends the whole page at once. The page is rendered synchronously, pages with
+    awaitable children (async components, see Await) are sent with
+    StreamingResponse, or once resolve_awaitables() was awaited (html_response
+    does it for async endpoints).
+    """
+
     media_type = "text/html"
+    # pages are sent minified, set it to True to send the indented html
+    pretty = False
 
     def __init__(
         self,
@@ -33,8 +44,14 @@ class HTMLResponse(StarletteHTMLResponse):
         super().__init__(html_content, status_code, headers, media_type, background)
 
     def render(self, content: T.Any) -> bytes:
+        if hasattr(content, "render_into"):
+            # encoded straight into the body instead of rendering the whole
+            # page to a string and encoding it again
+            return content.render_into(
+                BytesIO(), pretty=self.pretty, encoding=self.charset
+            ).getvalue()
         if hasattr(content, "__render__"):
-            content = content.__render__()
+            content = content.__render__(pretty=self.pretty)
         return super().render(content=content)
 
 
@@ -48,6 +65,7 @@ def html_response(
             async def decorated(*args, **kwargs) -> HTMLResponse:
                 content = await endpoint(*args, **kwargs)
                 if isinstance(content, dom_tag.dom_tag):
+                    await content.resolve_awaitables()
                     return HTMLResponse(content)
                 return content
 
@@ -68,6 +86,8 @@ def html_response(
 
 class StreamingResponse(StarletteStreamingResponse):
     media_type = "text/html"
+    # pages are sent minified, set it to True to send the indented html
+    pretty = False
 
     def __init__(
         self,
@@ -78,12 +98,26 @@ class StreamingResponse(StarletteStreamingResponse):
         background: BackgroundTask = None,
     ) -> None:
         super().__init__(
-            html_content.__async_render__(),
+            html_content.__async_render__(pretty=self.pretty),
             status_code,
             headers,
             media_type,
             background,
         )
+        self.html_content = html_content
+
+    async def stream_response(self, send) -> None:
+        # the awaitables of the page run in a task group of the response, so the
+        # html before them is sent while they are awaited
+        async with anyio.create_task_group() as tasks:
+            self.body_iterator = self.html_content.__async_render__(
+                pretty=self.pretty, task_group=tasks
+            )
+            try:
+                await super().stream_response(send)
+            finally:
+                # left running if the client went away
+                tasks.cancel_scope.cancel()
 
 
 def streaming_response(